@@ -9,22 +9,262 @@
 
 #!cat IonQAPIservice.py
 import os, io, time, math
+import atexit, threading, hashlib, functools, tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import string, re
 import json
+from itertools import compress, islice
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-class IonQAPIservice:
+# use orjson (if installed) for faster JSON encoding/decoding of circuits and results
+try:
+    import orjson
 
-    def help(self, on_method="LIST"):
-        """
-help(on_method) - print help text 
----------------
-  input: on_method for which documentation is requested or  
-         "ALL" for all methods or "LIST" for simple list (default: on_method="LIST")
-        """
-        helptext = {}
-        helptext["class"] = """
+    def _dumpb(obj):
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            return json.dumps(obj).encode()
+
+    def _dumps(obj):
+        return _dumpb(obj).decode()
+
+    _loads = orjson.loads
+
+except ImportError:
+    _dumps = json.dumps
+    _loads = json.loads
+
+    def _dumpb(obj):
+        return json.dumps(obj).encode()
+
+# tables and patterns used to clean up OPENQASM lines and JSON input (built once)
+#  (str.translate removes single characters in one pass, much faster than re.sub)
+_DEL_WHITESPACE = str.maketrans('', '', '\r\t\n')
+_DEL_CR_TAB = str.maketrans('', '', '\r\t')
+_DEL_NL_SPACE = str.maketrans('', '', '\n ')
+_RE_TRAILING_SEMI = re.compile(r';$')
+_RE_TRAILING_DOT = re.compile(r'\.(?=[\]}])')
+
+# OPENQASM input starts with the version header (after blank lines and '//' comments)
+def _is_qasm(lines):
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith('//'):
+            return line.startswith("OPENQASM 2.0")
+    return False
+
+# size of the HTTP connection pool of the requests session: more concurrent threads
+#  would open (and discard) additional connections instead of reusing the pooled ones
+
+_POOL_MAXSIZE = 32
+
+def _num_workers(max_workers, njobs):
+    return max(1, min(max_workers, njobs, _POOL_MAXSIZE))
+
+# names of jobid files with an extension (a '.' in the last 5 characters) are used as they are,
+#  other names are a base for numbered files (see _next_file_index)
+_RE_FILE_EXT = re.compile(r'\.[^.]{0,4}\Z')
+
+def _has_extension(filebase):
+    return len(filebase) > 4 and _RE_FILE_EXT.search(filebase) is not None
+
+# index of the next numbered jobid file filebase.txt (-1), filebase0.txt, filebase1.txt, ...
+#  (one scan of the directory instead of probing every existing file)
+def _next_file_index(filebase):
+    dirname, stem = os.path.split(filebase)
+    pattern = re.compile(re.escape(stem) + r'(\d*)\.txt\Z')
+    nums = []
+    try:
+        with os.scandir(dirname or '.') as entries:
+            for entry in entries:
+                m = pattern.match(entry.name)
+                if m is not None:
+                    nums.append(int(m.group(1)) if m.group(1) else -1)
+    except OSError:
+        pass
+    return max(nums) + 1 if nums else -1
+
+# IonQ jobIDs (UIDs): 5 groups of lowercase hex characters
+_RE_JOBID = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\Z')
+_HEX_CHARS = frozenset('0123456789abcdef')
+
+# short names of backends accepted by get_waittime and the selections of several backends
+_BACKEND_ALIASES = {"aria": "qpu.aria-1", "qpu.aria": "qpu.aria-1", "harmony": "qpu.harmony"}
+_SPECIAL_BACKENDS = frozenset(("ALL", "ACCESS"))
+
+# options of cache_mode in submit_job and submit_batch
+_CACHE_MODES = frozenset(("off", "readWrite", "readOnly", "writeOnly"))
+
+# rotation angles used in the decomposition of 'special' gates
+_PI_2 = math.pi/2
+_7PI_2 = 7*math.pi/2
+
+# unified gate lookup used by translate_qasm:  'qiskit_gate': (family, 'ionq_gate')
+#  families: '1q' single target, '2q' two targets w/o control, 'ctl' controlled (2q & multi-qubit)
+#  (filled in reverse order of precedence, so that gates_1q wins over gates_2q_noctl etc.)
+
+def _build_dispatch(gates_1q, gates_2q_noctl, gates_2q_ctl, gates_mq):
+    dispatch = {}
+    for family, gates in (('ctl', gates_mq), ('ctl', gates_2q_ctl), 
+                          ('2q', gates_2q_noctl), ('1q', gates_1q)):
+        for k, v in gates.items():
+            dispatch[k] = (family, v)
+    return dispatch
+
+# gate lookup used by validate_circuit:  'gate': ('ionq_gate', renamed)
+#  (IonQ names map to themselves and take precedence over aliases of the same name)
+
+def _build_gate_lookup(gates):
+    lookup = {v: (v, False) for v in gates.values()}
+    for k, v in gates.items():
+        lookup.setdefault(k, (v, True))
+    return lookup
+
+# helper for validate_circuit: qubit lists given as tuples or NumPy arrays are converted to lists,
+#  single qubits to a list with one entry
+
+_SEQUENCE_TYPES = (list, tuple, np.ndarray)
+_QUBIT_KEYS = frozenset(["gate", "target", "targets", "control", "controls"])
+
+def _as_list(vals):
+    if isinstance(vals, list):
+        return vals
+    if isinstance(vals, np.ndarray):
+        return vals.tolist()
+    if isinstance(vals, tuple):
+        return list(vals)
+    return [vals]
+
+# helper for retrieve_job: IonQ returns a histogram {state (decimal string): probability or count},
+#  which is converted to probabilities and counts with keys as bit strings (vectorized over all states)
+
+def _results_from_histogram(resdata, nqbits, shots):
+    vals = np.fromiter(resdata.values(), dtype=np.float64, count=len(resdata))
+    spec = f"0{nqbits}b"
+    keys = [format(k, spec) for k in map(int, resdata)]
+
+    # returned 'counts' or 'probabilities'?
+    sumvals = vals.sum()
+    if sumvals > 0.8 and sumvals < 1.2:
+        probs = vals
+        cnts = np.rint(vals*shots).astype(np.int64)
+    else:
+        probs = vals/shots
+        cnts = np.fromiter(resdata.values(), dtype=np.int64, count=len(resdata))
+
+    sumprobs = probs.sum()
+    if sumprobs != 1.0:
+        probs = probs/sumprobs
+
+    # assign rounding losses of the counts to the most frequent state
+    sumcnts = int(cnts.sum())
+    if sumcnts != shots and len(cnts) > 0:
+        cnts[np.argmax(cnts)] += int(shots - sumcnts)
+
+    # drop states without counts (like _counts_from_probabilities)
+    mask = cnts > 0
+    return dict(zip(keys, probs.tolist())), dict(zip(compress(keys, mask), cnts[mask].tolist()))
+
+# helpers for extract_probabilities and extract_counts (vectorized over all states):
+
+def _round_probabilities(probs, ndigits):
+    # round all probabilities at once and drop states, which are rounded to zero
+    vals = np.round(np.fromiter(probs.values(), dtype=np.float64, count=len(probs)), ndigits)
+    mask = vals > 0
+    return dict(zip(compress(probs.keys(), mask), vals[mask].tolist()))
+
+def _counts_from_results(jobdict, as_array=False):
+    # counts of a completed job: listed 'counts' or computed from the probabilities (None without results)
+    #  as_array=True: tuple (list of states, np.int64 array of counts) instead of a dict
+    results = jobdict.get("results")
+    if results is None:
+        return None
+    if "counts" in results:
+        counts = results["counts"]
+        if as_array:
+            return list(counts), np.fromiter(counts.values(), dtype=np.int64, count=len(counts))
+        return counts
+    return _counts_from_probabilities(results.get("probabilities", results), jobdict.get("shots", 1024), as_array)
+
+def _num_digits(n):
+    # number of decimal digits of the shots (at least 1: round to one digit if no shots are given)
+    return len(str(n)) if n > 0 else 1
+
+def _counts_from_probabilities(probs, shots, as_array=False):
+    # counts are rounded to the nearest integer (truncating would bias all counts downwards)
+    cnts = np.rint(np.fromiter(probs.values(), dtype=np.float64, count=len(probs)) * shots).astype(np.int64)
+    mask = cnts > 0
+    if as_array:
+        return list(compress(probs.keys(), mask)), cnts[mask]
+    return dict(zip(compress(probs.keys(), mask), cnts[mask].tolist()))
+
+# helpers for custom gates in translate_qasm:
+#  a custom gate definition is compiled once into a template: list of (operation, arguments), where each
+#  argument is either the index of a qubit of the gate (int) or a string which is used as it is
+
+#  operations which are custom gates themselves (defined before, in custom_gates) are inlined
+
+def _compile_gate_template(qbits, deflist, custom_gates=None):
+    slots = {qb: j for j,qb in enumerate(qbits)}
+    template = []
+    for op in deflist:
+        opname, _, args = op.partition(" ")
+        args = [slots.get(a.strip(), a) for a in args.split(",")]
+        if custom_gates and opname in custom_gates:
+            inner_qbits, inner_template = custom_gates[opname]
+            args += inner_qbits[len(args):]
+            template.extend((name, [args[a] if type(a) is int else a for a in inner_args])
+                            for name, inner_args in inner_template)
+        else:
+            template.append((opname, args))
+    return template
+
+def _expand_gate_template(template, qubits):
+    return [f"{opname} {','.join(qubits[a] if type(a) is int else a for a in args)}" for opname, args in template]
+
+# gate loop of translate_qasm: QASM lines -> list of IonQ gate dicts
+#  (plain function with local variables only, so it can also be compiled as it is, e.g. with cythonize)
+
+def _emit_circuit(qc_list, qname, dispatch):
+    circ = []
+    _append = circ.append
+
+    for line in qc_list:
+
+        vals = line.split(" ")
+
+        family, gate = dispatch.get(vals[0], (None, None))
+        if family is None:
+            continue
+
+        if family == '1q':
+            _append({ "gate": gate, "target": qname[vals[1]] } )
+
+        else:
+
+            qval = vals[1].split(",")
+
+            if qval[-1] in qname:
+                qtgt = [ qname[qval[-1]] ]
+                qctl = [qname[q] for q in qval[:-1]]
+
+            if family == '2q':
+                qtgt.append(qname[qval[0]])
+                _append({ "gate": gate, "targets": qtgt})
+
+            else:
+                _append({ "gate": gate, "targets": qtgt, "controls": qctl })
+
+    return circ
+
+# help texts of all methods (see method 'help')
+_HELPTEXT = {}
+_HELPTEXT["class"] = """
 -----------------------------------------------------------------------
 Class 'IonQAPIservice': use IonQ's REST API to submit and retrieve jobs. 
 -----------------------------------------------------------------------
@@ -32,7 +272,7 @@ The IonQ API offers noise models for the 'Harmony' (11 qubits) and 'Aria-1' (25
 To use these options, and also to run circuits on IonQ's Aria-1 quantum computer, the circuit is 
   translated into JSON format and then submitted to IonQ's servers.
         """
-        helptext["class2"] = """
+_HELPTEXT["class2"] = """
 instantation: x = IonQAPIservice("api_token")
           or: x = IonQAPIservice()  if environment variable IONQ_API_TOKEN or IONQ_API_KEY or QISKIT_IONQ_API_TOKEN is defined
        optional 2nd argument: jobid_file_base (basename for saving jobIDs (UID strings) and submission time - only for jobs submitted to a QPU target, not simulation jobs),
@@ -40,11 +280,14 @@ instantation: x = IonQAPIservice("api_token")
                     in the same directory lines like: "submission_time : jobid_hash_string"
                     (the output file can also be defined by optional argument 'save_file=<filename>' 
                       in methods submit_job() or submit_multiple_jobs() )
+       optional arguments: verbose_init=True (report status of IonQ backends, see get_waittime(); default: False),
+                           skip_probe=True (do not check the API token with the IonQ server; default: False)
+         (the backend access of a token is cached for 5 minutes in ~/.ionq_api_cache/backends.json)
         """
-        helptext["header1"] = """
+_HELPTEXT["header1"] = """
 === Methods for job submission and retrieval of results:
         """
-        helptext["submit_job"] = """ 
+_HELPTEXT["submit_job"] = """ 
 submit_job(circuit_or_file, wait_minutes, verbose, **kwargs)
 ------------------------------------------------------------
   returns: dictionary with job_id, status, and input information as returned by IonQ;
@@ -66,10 +309,13 @@ submit_job(circuit_or_file, wait_minutes, verbose, **kwargs)
     noise={"model": "...", "seed": ...}: same as the previous two options together;
     target="...": provide backend 'target' (default: target="simulator"; other options: "qpu.harmony" (same as: "qpu"), "qpu.aria-1");
     backend=... (string or pointer to IonQBackend class): similar to option target but for backend=[pointer to IonQBackend instantation] together with circuit_or_file=[pointer to QuantumCircuit instantation] the qiskit_ionq API is used to translate the circuit for the given IonQBackend class;
+    cache_mode="...": reuse the job of an identical earlier submission (same circuit, shots, target, noise, ...) instead of submitting it again;
+      options: "off" (default), "readWrite", "readOnly" (only reuse), "writeOnly" (only record); submissions are recorded in ~/.ionq_api_cache/submissions.json
+      (removed with method 'clear_submission_cache'); other values return an error
         """
-        helptext["retrieve_job"] = """
-retrieve_job(jobid, wait_minutes, verbose)
-------------------------------------------
+_HELPTEXT["retrieve_job"] = """
+retrieve_job(jobid, wait_minutes, verbose, sharpen, use_cache)
+--------------------------------------------------------------
   returns: dictionary with job_id, status and input information as returned by IonQ, if the job is completed, 
            the returned results are provided under dictionary key {'results: {'counts": {...}, 'probabilities': {...}}};
     on error returns dictionary with entry {'error': error message}
@@ -77,11 +323,16 @@ retrieve_job(jobid, wait_minutes, verbose)
   jobid: a UID (hash-string) or dictionary with entry 'id': 'UID'; 
          if no jobid is provided, the last used or returned jobid is used (e.g. the jobid returned when submitting a job);
 
-  wait_minutes: wait for up to wait_minutes=N minutes for the job to complete (status is checked every 30 seconds), default is N=0;
+  wait_minutes: wait for up to wait_minutes=N minutes for the job to complete (status is checked in increasing intervals, starting after 1 second,
+     up to every minute for the simulator or every 15 minutes for QPU jobs), default is N=0;
 
   verbose: verbosity (True or False), default: True 
+
+  use_cache: jobs with status 'completed', 'failed' or 'canceled' do not change anymore and are saved
+     in directory '~/.ionq_api_cache'; with use_cache=True (default) a saved job is returned without
+     contacting the IonQ server (see also method 'clear_cache')
         """
-        helptext["cancel_job"] = """
+_HELPTEXT["cancel_job"] = """
 cancel_job(jobid, verbose) 
 --------------------------
   returns: dictionary with entries {'id': jobid, 'status': 'canceled'},
@@ -92,47 +343,73 @@ cancel_job(jobid, verbose)
 
   verbose: verbosity (True or False), default: True 
         """
-        helptext["submit_multiple_jobs"] = """
+_HELPTEXT["submit_multiple_jobs"] = """
 submit_multiple_jobs(list_of_circuits, wait_minutes, verbose, **kwargs)
 -----------------------------------------------------------------------
   returns dictionary with entry {'circuit_name': out_dict}, where out_dict is the returned dict from submit_job
+    (for circuits of a multi-circuit job: {'id': jobID, 'status': ..., 'parent_id': ...}, see function submit_batch)
     on error returns dictionary with entry {'error': error message}
 
   list_of_circuits list of dicts or files defining circuits or list of QuantumCircuits;
 
   wait_minutes, verbose, **kwargs: see function submit_jobs;
     here: name=... specifies a name base (circuit number is added to the 'name');
-    alternatively provide a list of circuit names with names=[...].
+    alternatively provide a list of circuit names with names=[...];
+    max_workers=N: number of circuits submitted concurrently (default: max_workers=8).
+
+  circuits are submitted as multi-circuit jobs of up to batch_size circuits (default: batch_size=25),
+    see function submit_batch; with separate_jobs=True every circuit is submitted as a job of its own.
 
   verbose: verbosity (True or False), default: True 
 
   **kwargs: see note under 'submit_job'
         """
-        helptext["retrieve_multiple_jobs"] = """
-retrieve_multiple_jobs(list_dict_file, wait_minutes, verbose)
--------------------------------------------------------------
+_HELPTEXT["retrieve_multiple_jobs"] = """
+retrieve_multiple_jobs(list_dict_file, wait_minutes, verbose, sharpen, max_workers)
+----------------------------------------------------------------------------------
   returns dictionary with entry {'circuit_name': out_dict}, where out_dict is the returned dict from retrieve_job
     on error returns dictionary with entry {'error': error message}
 
   list_dict_file list or dict or file containing jobIDs (one per line; with or without circuit_name;
 
-  wait_minutes, verbose: see function retrieve_job.
+  wait_minutes, verbose, sharpen: see function retrieve_job.
+
+  max_workers: number of jobs retrieved concurrently (default: max_workers=8)
 
   verbose: verbosity (True or False), default: True 
         """
-        helptext["cancel_multiple_jobs"] = """
-cancel_multiple_jobs(list_dict_file, verbose)
----------------------------------------------
+_HELPTEXT["submit_batch"] = """
+submit_batch(list_of_circuits, wait_minutes, verbose, batch_size, **kwargs)
+--------------------------------------------------------------------------
+  returns dictionary with entry {'circuit_name': out_dict} like submit_multiple_jobs, where out_dict is
+    {'id': jobID of the circuit, 'status': status of the multi-circuit job, 'parent_id': jobID of the multi-circuit job}
+    (not the full POST response, which submit_job returns for circuits submitted as single jobs);
+    on error returns dictionary with entry {'error': error message}
+
+  up to batch_size circuits (default: batch_size=25) with the same target, shots, and noise model are
+    submitted together as one multi-circuit job (one request and one queue entry instead of one per circuit);
+    if the server does not accept the multi-circuit job or does not list one jobID per circuit,
+    the circuits are submitted as single jobs; so are circuits with job metadata (e.g. qiskit circuits).
+
+  cache_mode: see function submit_job, an identical earlier multi-circuit job is reused as a whole.
+
+  list_of_circuits, wait_minutes, verbose, **kwargs: see function submit_multiple_jobs
+        """
+_HELPTEXT["cancel_multiple_jobs"] = """
+cancel_multiple_jobs(list_dict_file, verbose, max_workers)
+----------------------------------------------------------
   returns dictionary {'ids': list_of_cancelled_jobIDs};
     on error returns dictionary with entry {'error': error message};
 
   list_dict_file list or dict or file containing jobIDs (one per line; with or without circuit_name).
 
+  max_workers: number of jobs cancelled concurrently, if they have to be cancelled one by one (default: max_workers=8)
+
   verbose: verbosity (True or False), default: True 
         """
-        helptext["extract_probabilities"] = """
-extract_probabilities(jobdict, rounded)
-------------------------------
+_HELPTEXT["extract_probabilities"] = """
+extract_probabilities(jobdict, rounded, wait_minutes)
+------------------------------------------------
   returns probabilities for all circuit states with non-zero probabilities ;
     on error prints error message and returns None;
 
@@ -144,10 +421,12 @@ extract_probabilities(jobdict, rounded)
       or the jobid used to retrieve results)
   rounded: round the results to N digits, e.g. rounded=3; for 'rounded="auto" or rounded=-1 the
       rounding is done up to 1/shots  (e.g. for shots=1000 to 3 digits) (default: rounded=None)
+  wait_minutes: jobs which are not completed yet are polled (see retrieve_job) for up to wait_minutes 
+      before their results are extracted (default: wait_minutes=0, i.e. a single check)
         """
-        helptext["extract_counts"] = """
-extract_counts(jobdict)
------------------------
+_HELPTEXT["extract_counts"] = """
+extract_counts(jobdict, wait_minutes, as_array)
+-----------------------------------------------
   returns measured or simulated counts for all circuit states with non-zero counts;
     on error prints error message and returns None;
 
@@ -157,11 +436,14 @@ extract_counts(jobdict)
     if the input 'jobdict' is a valid JobID (UID string) or a list of jobID strings, the function will call retrieve_job first.
     if no jobid is provided, the last jobid is used (e.g. the jobid returned when submitting a job 
       or the jobid used to retrieve results)
+  wait_minutes: see function extract_probabilities
+  as_array: return the counts as tuple (list of states, numpy array of counts) instead of a dictionary
+      (faster for results with many states), default: as_array=False
         """
-        helptext["header2"] = """
+_HELPTEXT["header2"] = """
 ===  Helper methods: 
         """
-        helptext["set_jobid_dict"] = """
+_HELPTEXT["set_jobid_dict"] = """
 set_jobid_dict(jobid_dict)
 -------------------------
    IonQAPIservice saves the last used or returned 'jobid_dict' (dictionary containing entry 
@@ -169,7 +451,26 @@ set_jobid_dict(jobid_dict)
       This method replaces/updates the jobid_dict.
    Input 'jobid_dict': dictionary containing entry 'id':'jobid_UID'. Input can also be a jobid (UID).
         """
-        helptext["translate_qasm"] = """
+_HELPTEXT["clear_cache"] = """
+clear_cache(jobid)
+------------------
+   Remove the locally saved results of finished jobs (see 'retrieve_job')
+   Input 'jobid': UID or dict with entry 'id' of the job to remove; if jobid=None (default), all saved jobs are removed
+   (the recorded submissions of cache_mode and the saved backend list are kept, see 'clear_submission_cache').
+        """
+_HELPTEXT["clear_submission_cache"] = """
+clear_submission_cache()
+------------------------
+   Forget the recorded submissions of cache_mode (see 'submit_job'), so that identical circuits are submitted again;
+   removes ~/.ionq_api_cache/submissions.json.
+        """
+_HELPTEXT["clear_backend_cache"] = """
+clear_backend_cache()
+---------------------
+   Forget the backend list and calibration data kept by 'get_waittime' (reused for 60 seconds and 1 hour),
+   so that the next call fetches them again from the IonQ server.
+        """
+_HELPTEXT["translate_qasm"] = """
 translate_qasm(qasm_qc_list, verbose)
 -------------------------------------
    returns: JSON dict (string) with "body" dictionary for IonQ API, 
@@ -181,7 +482,7 @@ translate_qasm(qasm_qc_list, verbose)
 
   verbose: verbosity (True or False), default: True 
         """
-        helptext["validate_circuit"] = """
+_HELPTEXT["validate_circuit"] = """
 validate_circuit(circuit) 
 -------------------------
   returns: dictionary {'circuit': validated and corrected circuit, 'updated_entries': list of modified gate entries} 
@@ -189,7 +490,7 @@ validate_circuit(circuit)
 
   circuit: list of operations as being submitted to IonQ (operations are dicts of form {'gate': ..., 'target' or 'targets': ..., 'control' or 'controls': ...}). 
         """
-        helptext["validate_jobid_hash"] = """
+_HELPTEXT["validate_jobid_hash"] = """
 validate_jobid_hash(jobid)
 --------------------------
   The routine checks whether the provided 'jobid' is a UID, i.e. hash string containing 5 hex numbers of correct lengths;
@@ -198,7 +499,7 @@ validate_jobid_hash(jobid)
 
   jobid: UID (hash-string) or dictionary containing entry {'id': jobid}. 
         """
-        helptext["get_jobids_from_input"] = """
+_HELPTEXT["get_jobids_from_input"] = """
 get_jobids_from_input(list_dict_file, name_base)
 ------------------------------------------------
   The routine tries to retrieve jobIDs from a list or dictionary or file; 
@@ -211,7 +512,7 @@ get_jobids_from_input(list_dict_file, name_base)
   name_base: if the circuit names are not provided in the input, the name is given by 'name_baseN' 
     where N is the entry number (element# of list or dict or line# of file), default name_base="circuit_". 
         """
-        helptext["get_waittime"] = """
+_HELPTEXT["get_waittime"] = """
 get_waittime(backend, calib_data) 
 ---------------------------------
    - print current wait time (average queue time) for provided backend
@@ -221,37 +522,98 @@ get_waittime(backend, calib_data)
        backend="ACCESS" (default): print wait time and status for all backends, to which we have access
     calib_data: flag on whether also to print calibration/characterization results (default: False)
         """
-        helptext["help"] = """
+_HELPTEXT["help"] = """
 help(on_method) - print help text 
 --------------
   input: on_method for which documentation is requested  (e.g. help("submit_job") )
          or "ALL" for all methods or "LIST" for simple list  (default: on_method="LIST")
         """
 
-        all_methods = ["class", "class2", "header1", "submit_job", "retrieve_job", "cancel_job", 
-                     "submit_multiple_jobs", "retrieve_multiple_jobs", "cancel_multiple_jobs",
-                     "extract_probabilities", "extract_counts",
-                     "header2", "set_jobid_dict", "translate_qasm", "validate_circuit", 
-                     "validate_jobid_hash", "get_jobids_from_input", "get_waittime", "help"]
+_HELP_METHODS = ["class", "class2", "header1", "submit_job", "retrieve_job", "cancel_job", 
+                 "submit_multiple_jobs", "submit_batch", "retrieve_multiple_jobs", "cancel_multiple_jobs",
+                 "extract_probabilities", "extract_counts",
+                 "header2", "set_jobid_dict", "clear_cache", "clear_submission_cache", "clear_backend_cache",
+                 "translate_qasm", "validate_circuit",
+                 "validate_jobid_hash", "get_jobids_from_input", "get_waittime", "help"]
+
+# short overview printed by help("LIST"): full text of the headers, first line for each method
+_HELP_LIST = [_HELPTEXT[m] if m in ["class", "header1", "header2", "help"] else _HELPTEXT[m].split("\n")[1]
+              for m in _HELP_METHODS if m != "class2"]
+
+class IonQAPIservice:
+
+    # rename some gates as IonQ is using different notations for some gates
+    ## Gate list from IonQ API (https://docs.ionq.com/#section/Job-Inputs/Supported-Gates)
+    ## Gate Description          Gate  Description
+    ## x    Pauli X gate         not   alias for Pauli-X gate
+    ## y    Pauli Y gate         cnot  alias controlled Pauli-X gate
+    ## z    Pauli Z gate         v     Square root of not gate  (=sx=sqrt(not))
+    ## h    Hadamard gate        vi    Conjugate transpose of square-root-of-not gate (=sxdg)
+    ## s    S gate               si    Conjugate transpose of S gate
+    ## t    T gate               ti    Conjugate transpose of T gate
+    ## rx   X-axis rotation      xx    Ising XX gate: e^(-iθ X⊗X /2)
+    ## ry   Y-axis rotation      yy    Ising YY gate: e^(-iθ Y⊗Y /2)
+    ## rz   Z-axis rotation      zz    Ising ZZ gate: e^(-iθ Z⊗Z /2)
+    ## swap Swaps two qubits
+
+    # translation dict of form: 'qiskit_gate': 'ionq_gate'
+    gates_1q = {'h':'h', 'i':'id', 'id':'id', 'p':'z', 'rx':'rx', 'ry':'ry', 'rz':'rz', 'not':'x',
+        's':'s', 'sdg':'si', 'sx':'v', 'sxdg':'vi', 't':'t', 'tdg':'ti', 'x':'x', 'y':'y', 'z':'z'}
+    gates_2q_ctl = {'ch':'h', 'cnot':'x', 'cp':'z', 'crx':'rx', 'cry':'ry', 'crz':'rz',  
+            'cx':'x', 'cy':'y', 'cz':'z', 'csx':'v', 'cv':'v', 'csxdg':'vi', 'cvi':'vi'} 
+    gates_2q_noctl = {'rxx':'xx', 'ryy':'yy', 'rzz':'zz', 'swap':'swap'}
+    gates_mq = {'mcp':'z', 'mcphase':'z', 'mct':'t', 'ccx':'x', 'c3x':'x', 'c4x':'x', 
+        'mcx':'x', 'mcx_gray':'x', 'toffoli':'x'}
+
+    # 'special' gates, which are not provided by the IonQ API, are replaced by an equivalent sequence:
+    #  format dict:  "gate_name" : [list_of_target_qubits, list_of_control_qubits, list_of_parameters,
+    #            dict of gates and tuple with list of target, control, parameters used for this gate
+    #   e.g. sswap(a,b)=sqrt(swap(a,b))=cnot(b,a)*csx(a,b)*cnot(b,a)
+    #        iswap(a,b) = XX(pi)+YY(pi) = S(a)*S(b)*H(0)*CX(b,a)*CX(a,b)*H(b)
+    #        siswap(a,b)=sqrt(iswap(a,b))
+    gates_special = {'sswap': [[0,1],[],[], [('x',[1],[0],[]), ('v',[0],[1],[]), ('x',[1],[0],[]) ]],
+            'iswap': [[0,1],[],[], [('s',[0],[],[]),('s',[1],[],[]),('h',[0],[],[]),('x',[1],[0],[]),
+                                     ('x',[0],[1],[]),('h',[1],[],[]) ]],
+            'siswap': [[0,1],[],[], [('v',[0],[],[]),('v',[1],[],[]),('rz',[0],[],[_PI_2]),('x',[1],[0],[]),
+                                     ('v',[0],[],[]),('v',[1],[],[]),('rz',[0],[],[_7PI_2]),
+                                     ('rz',[1],[],[_7PI_2]),('v',[0],[],[]),('rz',[0],[],[_PI_2]),
+                                     ('x',[1],[0],[]),('v',[0],[],[]) ]],
+            'cswap': [[0,1],[0],[], [('x',[1],[0],[]),('x',[0],[1,2],[]),('x',[1],[0],[]) ]],
+    }
+
+    # lookup of valid gate names of each group, used by validate_circuit (see _build_gate_lookup)
+    _valid_1q = _build_gate_lookup(gates_1q)
+    _valid_2q_ctl = _build_gate_lookup(gates_2q_ctl)
+    _valid_2q_noctl = _build_gate_lookup(gates_2q_noctl)
+    _valid_mq = _build_gate_lookup(gates_mq)
+
+    # unified lookup used by translate_qasm (see _build_dispatch)
+    _dispatch = _build_dispatch(gates_1q, gates_2q_noctl, gates_2q_ctl, gates_mq)
+
+    def help(self, on_method="LIST"):
+        """
+help(on_method) - print help text 
+---------------
+  input: on_method for which documentation is requested or  
+         "ALL" for all methods or "LIST" for simple list (default: on_method="LIST")
+        """
+        if on_method == "LIST":
+            print()
+            for text in _HELP_LIST:
+                print(text)
 
-        if on_method in ["ALL", "LIST"]:
+        elif on_method == "ALL":
             print()
-            for m in all_methods:
-               if m in ["class", "header1", "header2", "help"]:
-                   print(helptext[m])
-               elif on_method == "LIST":
-                   if m != "class2":
-                       print(helptext[m].split("\n")[1])
-               else:
-                   print(helptext[m])
+            for m in _HELP_METHODS:
+                print(_HELPTEXT[m])
 
         else:
-           if on_method in all_methods:
-               print(helptext[on_method])
+           if on_method in _HELP_METHODS:
+               print(_HELPTEXT[on_method])
            else:
                print("*** This method does not exist, use 'help()' or 'help(method)' where")
                print("***   'method' is one of:", end=" ")
-               for m in all_methods:
+               for m in _HELP_METHODS:
                    if m != "class2" and not m.startswith("header"): 
                        print(m, end=", ")
                print("\n")
@@ -259,7 +621,7 @@ help(on_method) - print help text
 ######################################################################################
 
 
-    def __init__(self, ionq_token=None, jobid_file_base='qpu_job'):
+    def __init__(self, ionq_token=None, jobid_file_base='qpu_job', verbose_init=False, skip_probe=False):
 
         if ionq_token is None:
             ionq_token = os.getenv("IONQ_API_KEY") or os.getenv("IONQ_API_TOKEN") or os.getenv("QISKIT_IONQ_API_TOKEN")
@@ -268,42 +630,93 @@ help(on_method) - print help text
             print('ERROR: IonQ API token not provided; use: IonQAPIservice("ionq_token")')
             return
           
-        requests.packages.urllib3.disable_warnings()
+        # one session for all API calls: keeps the TLS connection to api.ionq.co alive
+        #   between requests and retries transient server errors
+        #   (POST is not retried to avoid duplicate job submissions)
+        self.session = requests.Session()
+        retries = Retry(total=5, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504),
+                        allowed_methods=frozenset(['GET', 'PUT', 'DELETE']))
+        self.session.mount('https://', HTTPAdapter(pool_connections=16, pool_maxsize=_POOL_MAXSIZE, max_retries=retries))
+
+        # local directory to save finished jobs (results of completed jobs do not change)
+        self.cache_dir = os.path.join(os.path.expanduser("~"), ".ionq_api_cache")
+
+        # responses of the backends and characterization endpoints: url -> (time, data), see _cached_get
+        self._http_cache = {}
 
         # check whether the provided IonQ API token has access to QPU hardware
+        #   (the result is cached for 5 minutes per token, stored under a hash of the token)
   
         header = {'Authorization': f'apiKey {ionq_token}',}
 
-        response = requests.get(f'https://api.ionq.co/v0.3/backends', headers=header)
-
-        if response.ok:
+        backends_file = os.path.join(self.cache_dir, "backends.json")
+        token_key = hashlib.sha256(ionq_token.encode()).hexdigest()[:16]
+        backends = {}
+        self.has_access = None
+        try:
+            with open(backends_file) as f:
+                backends = _loads(f.read())
+            entry = backends[token_key]
+            if skip_probe or time.time() - entry["ts"] < 300:
+                self.has_access = entry["has_access"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+        if self.has_access is None and skip_probe:
+            self.has_access = {}
 
+        if self.has_access is not None:
             self.api_header = header
-            self.has_access = {}
-            data = response.json()
+            self.session.headers.update(header)
 
-            # report status of IonQ backends:
-            for backend in data:
-                self.has_access.update({ backend["backend"]:backend["has_access"] })
+        else:
 
-            self.get_waittime()
+            response = self.session.get(f'https://api.ionq.co/v0.3/backends', headers=header)
+
+            if response.ok:
+
+                self.api_header = header
+                self.session.headers.update(header)
+                self.has_access = {}
+                data = _loads(response.content)
+                self._http_cache['https://api.ionq.co/v0.3/backends'] = (time.monotonic(), data)
+
+                for backend in data:
+                    self.has_access.update({ backend["backend"]:backend["has_access"] })
+
+                try:
+                    if not isinstance(backends, dict):
+                        backends = {}
+                    backends[token_key] = {"ts": time.time(), "has_access": self.has_access}
+                    self._write_cache_file(backends_file, _dumps(backends))
+                except OSError:
+                    pass
             
-        else:
+            else:
 
-            errtxt = f"{response}"
-            if response.status_code == 400:
-                errtxt += f": Bad request"
+                errtxt = f"{response}"
+                if response.status_code == 400:
+                    errtxt += f": Bad request"
 
-            elif response.status_code == 401:
-                errtxt += ": Authentication failed"
+                elif response.status_code == 401:
+                    errtxt += ": Authentication failed"
+
+                print('ERROR accessing IonQ Server using provided IonQ API token "'+ionq_token+'":', errtxt)
 
-            print('ERROR accessing IonQ Server using provided IonQ API token "'+ionq_token+'":', errtxt)
+                self.api_header = {}
 
-            self.api_header = {}
+        # report status of IonQ backends:
+        if verbose_init and len(self.api_header) > 0:
+            self.get_waittime()
 
         self.__name__ = "IonQAPIservice"
         self.__version__ = 0.2
         self.last_jobid_dict = {'id': 'not set'}
+        self._save_lock = threading.Lock()  # jobs of submit_multiple_jobs write to the same file
+        self._jobid_files = {}  # open (appending) file handles of jobid files
+        self._jobid_next = {}  # next free index of numbered jobid files (see _new_jobid_file)
+        self._submission_cache = None  # hash of submitted job data -> jobID (see cache_mode in submit_job)
+        self._parse_qasm_cached = functools.lru_cache(maxsize=256)(self._parse_qasm)  # see _translate_qasm
 
         # local file to save jobIDs (UIDs=hash-strings) for jobs submitted to IonQ hardware 
         # (can be used later to retrieve results)
@@ -313,7 +726,7 @@ help(on_method) - print help text
             self.jobid_file_base = "qpu_jobs" if jobid_file_base == True else ""
         else:
             jobid_file_base = str(jobid_file_base)
-            if len(jobid_file_base) > 4 and jobid_file_base.find(".", -5) >= 0:
+            if _has_extension(jobid_file_base):
                 self.jobid_file_base = jobid_file_base
             else:
                 self.jobid_file_base = jobid_file_base + ".txt"
@@ -343,45 +756,6 @@ help(on_method) - print help text
             except ImportError:
                 self.cirq_installed = 1
 
-        # rename some gates as IonQ is using different notations for some gates
-        ## Gate list from IonQ API (https://docs.ionq.com/#section/Job-Inputs/Supported-Gates)
-        ## Gate Description          Gate  Description
-        ## x    Pauli X gate         not   alias for Pauli-X gate
-        ## y    Pauli Y gate         cnot  alias controlled Pauli-X gate
-        ## z    Pauli Z gate         v     Square root of not gate  (=sx=sqrt(not))
-        ## h    Hadamard gate        vi    Conjugate transpose of square-root-of-not gate (=sxdg)
-        ## s    S gate               si    Conjugate transpose of S gate
-        ## t    T gate               ti    Conjugate transpose of T gate
-        ## rx   X-axis rotation      xx    Ising XX gate: e^(-iθ X⊗X /2)
-        ## ry   Y-axis rotation      yy    Ising YY gate: e^(-iθ Y⊗Y /2)
-        ## rz   Z-axis rotation      zz    Ising ZZ gate: e^(-iθ Z⊗Z /2)
-        ## swap Swaps two qubits
-
-        # translation dict of form: 'qiskit_gate': 'ionq_gate'
-        self.gates_1q = {'h':'h', 'i':'id', 'id':'id', 'p':'z', 'rx':'rx', 'ry':'ry', 'rz':'rz', 'not':'x',
-            's':'s', 'sdg':'si', 'sx':'v', 'sxdg':'vi', 't':'t', 'tdg':'ti', 'x':'x', 'y':'y', 'z':'z'}
-        self.gates_2q_ctl = {'ch':'h', 'cnot':'x', 'cp':'z', 'crx':'rx', 'cry':'ry', 'crz':'rz',  
-                'cx':'x', 'cy':'y', 'cz':'z', 'csx':'v', 'cv':'v', 'csxdg':'vi', 'cvi':'vi'} 
-        self.gates_2q_noctl = {'rxx':'xx', 'ryy':'yy', 'rzz':'zz', 'swap':'swap'}
-        self.gates_mq = {'mcp':'z', 'mcphase':'z', 'mct':'t', 'ccx':'x', 'c3x':'x', 'c4x':'x', 
-            'mcx':'x', 'mcx_gray':'x', 'toffoli':'x'}
-
-        # 'special' gates, which are not provided by the IonQ API, are replaced by an equivalent sequence:
-        #  format dict:  "gate_name" : [list_of_target_qubits, list_of_control_qubits, list_of_parameters,
-        #            dict of gates and tuple with list of target, control, parameters used for this gate
-        #   e.g. sswap(a,b)=sqrt(swap(a,b))=cnot(b,a)*csx(a,b)*cnot(b,a)
-        #        iswap(a,b) = XX(pi)+YY(pi) = S(a)*S(b)*H(0)*CX(b,a)*CX(a,b)*H(b)
-        #        siswap(a,b)=sqrt(iswap(a,b))
-        self.gates_special = {'sswap': [[0,1],[],[], [('x',[1],[0],[]), ('v',[0],[1],[]), ('x',[1],[0],[]) ]],
-                'iswap': [[0,1],[],[], [('s',[0],[],[]),('s',[1],[],[]),('h',[0],[],[]),('x',[1],[0],[]),
-                                         ('x',[0],[1],[]),('h',[1],[],[]) ]],
-                'siswap': [[0,1],[],[], [('v',[0],[],[]),('v',[1],[],[]),('rz',[0],[],[math.pi/2]),('x',[1],[0],[]),
-                                         ('v',[0],[],[]),('v',[1],[],[]),('rz',[0],[],[7*math.pi/2]),
-                                         ('rz',[1],[],[7*math.pi/2]),('v',[0],[],[]),('rz',[0],[],[math.pi/2]),
-                                         ('x',[1],[0],[]),('v',[0],[],[]) ]],
-                'cswap': [[0,1],[0],[], [('x',[1],[0],[]),('x',[0],[1,2],[]),('x',[1],[0],[]) ]],
-        }
-
     ####################################################
     #helper methods: 
 
@@ -394,7 +768,7 @@ help(on_method) - print help text
             mydict = self.validate_jobid_hash(jobid_dict)
 
         elif isinstance(jobid_dict, dict):
-            if "id" not in jobid_dict.keys():
+            if "id" not in jobid_dict:
                 print("dict does not contain entry 'id'")
                 return None
             mydict = self.validate_jobid_hash(jobid_dict["id"])
@@ -405,13 +779,107 @@ help(on_method) - print help text
         else:
             mydict ={'error': f"input '{jobid_dict}' does not contain a JobID hash string"}
 
-        if "error" in mydict.keys():
+        if "error" in mydict:
             print(f"ERROR: {mydict['error']}")
             return None
 
         self.last_jobid_dict = jobid_dict if isinstance(jobid_dict, dict) else mydict 
         return self
 
+    #--------------------------------------------
+
+    def _cache_file(self, jobid, sharpen=False):
+        return os.path.join(self.cache_dir, f"{jobid}_sharpen.json" if sharpen else f"{jobid}.json")
+
+    def _write_cache_file(self, cache_file, text):
+        # write to a temporary file first (unique across threads and processes), then rename it:
+        #  concurrent readers must never see a partial file
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(text)
+            os.replace(tmp_name, cache_file)
+        finally:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+
+    def _save_to_cache(self, data, sharpen=False):
+        try:
+            self._write_cache_file(self._cache_file(data["id"], sharpen), _dumps(data))
+        except (OSError, TypeError, ValueError):
+            pass
+
+    def _submissions(self):
+        # lazily load the recorded submissions:  {hash of submitted job data: jobID}
+        if self._submission_cache is None:
+            try:
+                with open(os.path.join(self.cache_dir, "submissions.json")) as f:
+                    self._submission_cache = _loads(f.read())
+            except (OSError, ValueError):
+                self._submission_cache = {}
+        return self._submission_cache
+
+    def _submission_key(self, data):
+        # identical job data submitted with the same API token gives the same key
+        datastr = json.dumps(data, sort_keys=True, default=str)
+        return hashlib.sha256((self.api_header.get("Authorization", "") + datastr).encode()).hexdigest()
+
+    def _save_submission(self, key, jobid):
+        with self._save_lock:
+            self._submissions()[key] = jobid
+            try:
+                self._write_cache_file(os.path.join(self.cache_dir, "submissions.json"), _dumps(self._submission_cache))
+            except OSError:
+                pass
+
+    def clear_cache(self, jobid=None):
+        if jobid is None:
+            # only the saved jobs '<jobid>.json' and '<jobid>_sharpen.json' (not backends.json, submissions.json)
+            if os.path.isdir(self.cache_dir):
+                for fname in os.listdir(self.cache_dir):
+                    stem, ext = os.path.splitext(fname)
+                    if ext == ".json" and _RE_JOBID.match(stem.replace("_sharpen", "")):
+                        os.remove(os.path.join(self.cache_dir, fname))
+            return self
+
+        mydict = self.validate_jobid_hash(jobid)
+        if "error" in mydict:
+            print(f"ERROR: {mydict['error']}")
+            return None
+
+        for sharpen in [False, True]:
+            if os.path.exists(self._cache_file(mydict["id"], sharpen)):
+                os.remove(self._cache_file(mydict["id"], sharpen))
+        return self
+
+    def clear_submission_cache(self):
+        with self._save_lock:
+            self._submission_cache = {}
+            submissions_file = os.path.join(self.cache_dir, "submissions.json")
+            if os.path.exists(submissions_file):
+                os.remove(submissions_file)
+        return self
+
+    def clear_backend_cache(self):
+        self._http_cache.clear()
+        return self
+
+    def _cached_get(self, url, ttl):
+        # GET for data which change slowly (backend status, calibrations): a response is reused for ttl seconds
+        #  returns (data, None) or on error (None, response)
+        entry = self._http_cache.get(url)
+        if entry is not None and time.monotonic() - entry[0] < ttl:
+            return entry[1], None
+
+        response = self.session.get(url)
+        if not response.ok:
+            return None, response
+
+        data = _loads(response.content)
+        self._http_cache[url] = (time.monotonic(), data)
+        return data, None
+
     #--------------------------------------------
     # to get an OPENQASM circuit, do: qasm_string = qiskit_circuit.qasm()  or 
     #                                 qasm_string = cirq.qasm(circuit)
@@ -426,6 +894,17 @@ help(on_method) - print help text
         Note: a string with QASM circuit can easily be obtained by the method: quantumCircuit.qasm() 
       verbose: verbosity (True or False), default: True 
         """
+        data = self._translate_qasm(qc_list, verbose)
+        return None if data is None else _dumps(data)
+
+    def _translate_qasm(self, qc_list, verbose=False):
+        # translate_qasm without the conversion to a JSON string (used by _prepare_job);
+        #   results are cached per QASM text (callers must not modify the returned dict)
+        if verbose or not isinstance(qc_list, (str, list)):
+            return self._parse_qasm(qc_list, verbose)
+        return self._parse_qasm_cached(qc_list if isinstance(qc_list, str) else tuple(qc_list))
+
+    def _parse_qasm(self, qc_list, verbose=False):
         if qc_list is None: return None
 
         gate_list = []
@@ -446,14 +925,15 @@ help(on_method) - print help text
                     qc_list += tmp[-1]
                 qc_list = qc_list.split(";")
 
+        if isinstance(qc_list, tuple):
+            qc_list = list(qc_list)
+
         if not isinstance(qc_list, list):
-            if verbose: print(f"input 'qc_list' must be of type string or list (input is {qctype})")
+            if verbose: print(f"input 'qc_list' must be of type string or list (input is {type(qc_list)})")
             return None
 
-        qc_list = [re.sub('[\r\t\n]','', j) for j in qc_list]
-        qc_list = [j.replace("\\n","") for j in qc_list]
-        qc_list = [re.sub(';$','', j) for j in qc_list]
-        qc_list = [j.strip() for j in qc_list if len(j.strip())>0 and not j.startswith('//')]
+        qc_list = (_RE_TRAILING_SEMI.sub('', j.translate(_DEL_WHITESPACE).replace("\\n","")).strip() for j in qc_list)
+        qc_list = [j for j in qc_list if len(j)>0 and not j.startswith('//')]
         
         #first entries in the list: 'OPENQASM 2.0','include "qelib1.inc"'
         str1 = qc_list.pop(1) ; str0 = qc_list.pop(0)
@@ -478,18 +958,18 @@ help(on_method) - print help text
                 if len(mylist) == 1:
                     name,num = mylist[0].split("[")
                     nbits = int(num[:-1])
-                    namedict = { name+'['+str(j)+']':j for j in range(nbits)}
+                    namedict = { f"{name}[{j}]":j for j in range(nbits)}
                 else:
                     nbits = len(mylist)
                     namedict = { mylist[j]:j for j in range(nbits)}
 
                 if vals[0] == "qreg":
                     qname = namedict.copy()
-                    metadata.update({ "qreg": list(qname.keys()) })
+                    metadata.update({ "qreg": list(qname) })
                     if verbose: print('qubits:',nbits,qname)
                 else:
                     bname = namedict.copy()
-                    metadata.update({ "creg": list(bname.keys()) })
+                    metadata.update({ "creg": list(bname) })
                     if verbose: print('cl.bits:',nbits,bname)
 
             elif vals[0] == "measure":
@@ -499,7 +979,7 @@ help(on_method) - print help text
  
                 for q,c in zip(qlist,clist):
 
-                    if q in qname.keys():
+                    if q in qname:
                         qval = qname[q]
                     else:
                         if q.find('[') > 0: 
@@ -507,7 +987,7 @@ help(on_method) - print help text
                         else:
                             qval = int(q) if q.isdigit() else -1
 
-                    if c in bname.keys():
+                    if c in bname:
                         bval = bname[c]
                     else:
                         if c.find('[') > 0:
@@ -524,8 +1004,9 @@ help(on_method) - print help text
 
         #check for custom gates (listed first):
         if len(gate_list) > 0:
-            custom_gates = {} ; tmp_gates = {}
+            custom_gates = {}
 
+            # gates are defined before they are used, so nested custom gates can be inlined right away
             for line in gate_list:
                 
                 tmp,deflist = line.split("{")
@@ -534,21 +1015,10 @@ help(on_method) - print help text
 
                 qbits = vals[1].split(",")
                 deflist = [k.strip() for k in deflist.split(";")[:-1] ]
-                if len(deflist) > 1:
-                    custom_gates.update({vals[0]: [qbits,deflist] })  
-                else:
-                    tmp_gates.update({vals[0]: [qbits,deflist] })
-
-            for k,vals in tmp_gates.items():
-                name = vals[1][0].split(" ")[0]
-                if name in custom_gates.keys():
-                    #v,d=custom_gates[name]
-                    #if vals[0]==v:
-                    custom_gates.update({k:custom_gates[name]})
-                else:
-                    custom_gates.update({k:vals})
+                custom_gates.update({vals[0]: [qbits, _compile_gate_template(qbits, deflist, custom_gates)] })
 
             myqc_list = []
+            _append = myqc_list.append ; _extend = myqc_list.extend
             for line in qc_list:
 
                 if line.startswith("gate "):
@@ -556,20 +1026,15 @@ help(on_method) - print help text
 
                 vals = line.split(" ")
 
-                if vals[0] not in custom_gates.keys():
-                    myqc_list.append(line)
+                if vals[0] not in custom_gates:
+                    _append(line)
 
                 else:
 
+                    qbits, template = custom_gates[vals[0]]
                     qubits = vals[1].split(",")
-                    qbits, deflist = custom_gates[vals[0]]
-                    qdict = {qb:q for qb,q in zip(qbits,qubits)} 
-                    mydeflist = []
-                    for op in deflist:
-                        for qb,q in qdict.items():
-                            op = op.replace(qb,q)
-                        mydeflist.append(op)
-                    myqc_list.extend(mydeflist)
+                    qubits += qbits[len(qubits):]
+                    _extend(_expand_gate_template(template, qubits))
 
             #if verbose: 
             #    print("custom_gates:", custom_gates)
@@ -578,36 +1043,9 @@ help(on_method) - print help text
             qc_list = myqc_list
             
         if len(qname) > 0:
+            circ = _emit_circuit(qc_list, qname, self._dispatch)
 
-            for j in range(len(qc_list)):
-
-                vals = qc_list[j].split(" ")
-
-                if vals[0] in self.gates_1q.keys():
-                    circ.append({ "gate": f"{self.gates_1q[vals[0]]}", "target": qname[vals[1]] } )
-
-                else:
-
-                    qval = vals[1].split(",")
-
-                    if qval[-1] in qname.keys():
-                        qtgt = [ qname[qval[-1]] ]
-                        qctl = [qname[qval[j]] for j in range(len(qval)-1)]
-
-                    if vals[0] in self.gates_2q_noctl.keys():
-                        qtgt.append(qname[qval[0]])
-                        circ.append({ "gate": f"{self.gates_2q_noctl[vals[0]]}", 
-                                     "targets": qtgt})
-
-                    elif vals[0] in self.gates_2q_ctl.keys():   
-                        circ.append({ "gate": f"{self.gates_2q_ctl[vals[0]]}", 
-                                     "targets": qtgt, "controls": qctl })
-
-                    elif vals[0] in self.gates_mq.keys():
-                        circ.append({ "gate": f"{self.gates_mq[vals[0]]}", 
-                                     "targets": qtgt, "controls": qctl })
-
-        return json.dumps({"body": { "gateset": "qis", "qubits": len(qname), "circuit": circ, "metadata": metadata } })
+        return {"body": { "gateset": "qis", "qubits": len(qname), "circuit": circ, "metadata": metadata } }
 
     ####################
 
@@ -623,6 +1061,10 @@ help(on_method) - print help text
         valid_circ = []
         updates = []
 
+        # local names for the gate tables (looked up for every entry)
+        valid_1q, valid_2q_ctl, valid_2q_noctl = self._valid_1q, self._valid_2q_ctl, self._valid_2q_noctl
+        valid_mq, gates_special = self._valid_mq, self.gates_special
+
         if not isinstance(circuit, list):
             return {"error": "'circuit' is not a list of entries (gates & target & control qubits)"}
 
@@ -631,91 +1073,73 @@ help(on_method) - print help text
             if not isinstance(entry, dict):
                 return {"error": f"'circuit' entry {j} is not dictionary"} 
 
-            if "gate" not in entry.keys():
+            if "gate" not in entry:
                 continue
 
             mygate = entry["gate"]
             flg_update = False
 
-            if "target" in entry.keys():
-                tgt_vals = entry["target"]
-
-                if isinstance(tgt_vals, list):
+            # IonQ format: 'targets' and 'controls' are lists ('target' and 'control' single qubits)
+            #  (single qubits, the common case, are wrapped directly without calling _as_list)
+            tgt_vals = entry.get("target")
+            if tgt_vals is not None:
+                if isinstance(tgt_vals, _SEQUENCE_TYPES):
                     flg_update = True
+                    tgt_vals = _as_list(tgt_vals)
                 else:
                     tgt_vals = [tgt_vals]
-
-            elif "targets" in entry.keys():
-                tgt_vals = entry["targets"]
-
-                if not isinstance(tgt_vals, list):
+            else:
+                tgt_vals = entry.get("targets")
+                if tgt_vals is None:
+                    return {"error": f"'circuit' entry {j}: Gate '{mygate}' has no 'target'"}
+                if isinstance(tgt_vals, _SEQUENCE_TYPES):
+                    tgt_vals = _as_list(tgt_vals)
+                else:
                     flg_update = True
                     tgt_vals = [tgt_vals]
 
-            else:
-                return {"error": f"'circuit' entry {j}: Gate '{mygate}' has no 'target'"}
-
-            if "control" in entry.keys():
-                ctl_vals = entry["control"]
-
-                if isinstance(ctl_vals, list):
+            ctl_vals = entry.get("control")
+            if ctl_vals is not None:
+                if isinstance(ctl_vals, _SEQUENCE_TYPES):
                     flg_update = True
+                    ctl_vals = _as_list(ctl_vals)
                 else:
                     ctl_vals = [ctl_vals]
-
-            elif "controls" in entry.keys():
-                ctl_vals = entry["controls"]
-
-                if not isinstance(ctl_vals, list):
-                    flg_update = True
-                    ctl_vals = [ctl_vals]
             else:
-                ctl_vals = []
-
-            if "parameters" in entry.keys():
-                parvals = entry["parameters"]
-
-                if not isinstance(parvals, list):
-                    parvals = [parvals]
-                    flg_update = True
-
-            elif "parameter" in entry.keys():
-                parvals = [entry["parameter"]]
-
-            if "rotations" in entry.keys():
-                parvals = entry["rotations"]
-
-                if not isinstance(parvals, list):
-                    parvals = [parvals]
+                ctl_vals = entry.get("controls")
+                if ctl_vals is None:
+                    ctl_vals = []
+                elif isinstance(ctl_vals, _SEQUENCE_TYPES):
+                    ctl_vals = _as_list(ctl_vals)
+                else:
                     flg_update = True
+                    ctl_vals = [ctl_vals]
 
-            elif "rotation" in entry.keys():
-                parvals = [entry["rotation"]]
+            # 'parameters' and 'rotations' are lists as well
+            if ("parameters" in entry and not isinstance(entry["parameters"], _SEQUENCE_TYPES)) or \
+               ("rotations" in entry and not isinstance(entry["rotations"], _SEQUENCE_TYPES)):
+                flg_update = True
 
-            if mygate in self.gates_special:
+            special = gates_special.get(mygate)
+            if special is not None:
 
-                qtgt = self.gates_special[mygate][0]
-                qctl = self.gates_special[mygate][1]
-                qpar = self.gates_special[mygate][2]
+                qtgt, qctl, qpar, qgates = special
 
                 if len(qtgt) != len(tgt_vals) or len(qctl) != len(ctl_vals):
                     return{"error": 
                     f"'circuit' entry {j}: special gate {mygate} has wrong number of 'targets' and/or 'controls'"}
 
                 qbits = tgt_vals + ctl_vals
-                qgates = self.gates_special[mygate][3]
 
                 for g,t,c,p in qgates:
 
-                    myt = [qbits[i] for i in t]
-                    circ = {"gate": f"{g}", "targets": myt}
+                    circ = {"gate": g, "targets": [qbits[i] for i in t]}
 
-                    if len(c) > 0:
-                        myc = [qbits[i] for i in c]
-                        circ.update({"controls": myc})
+                    if c:
+                        circ["controls"] = [qbits[i] for i in c]
 
-                    if len(p) > 0:
-                        circ.update({"parameters": p})
+                    if p:
+                        circ["parameters"] = list(p)
 
                     valid_circ.append(circ)
 
@@ -724,51 +1148,43 @@ help(on_method) - print help text
 
             if len(tgt_vals) > 1:
 
-                if mygate not in self.gates_2q_noctl.values():
-                    if mygate in self.gates_2q_noctl.keys():
-                        mygate = self.gates_2q_noctl[mygate]
-                        flg_update = True
-                    else:
-                        return {"error": 
-                        f"'circuit' entry {j}: gate '{mygate}' is not a valid gate with 2 targets"}
+                gate = valid_2q_noctl.get(mygate)
+                if gate is None:
+                    return {"error": 
+                    f"'circuit' entry {j}: gate '{mygate}' is not a valid gate with 2 targets"}
 
             elif len(ctl_vals) > 1:
 
-                if mygate not in self.gates_mq.values():
-                    if mygate in self.gates_mq.keys():
-                        mygate = self.gates_mq[mygate]
-                        flg_update = True
-                    else: 
-                        return {"error": 
-                        f"'circuit' entry {j}: gate '{mygate}' is not a valid multi-qubit gate"}
+                gate = valid_mq.get(mygate)
+                if gate is None:
+                    return {"error": 
+                    f"'circuit' entry {j}: gate '{mygate}' is not a valid multi-qubit gate"}
 
             elif len(ctl_vals) == 1:
 
-                if mygate not in self.gates_2q_ctl.values():
-                    if mygate in self.gates_2q_ctl.keys():
-                        mygate = self.gates_2q_ctl[mygate]
-                        flg_update = True
+                gate = valid_2q_ctl.get(mygate)
+                if gate is None:
 
-                    elif mygate in self.gates_2q_noctl.values() or mygate in self.gates_2q_noctl.keys():
-                        if mygate not in self.gates_2q_noctl.values():
-                            mygate = self.gates_2q_noctl[mygate]
-                        tgt_vals.extend(ctl_vals)
-                        ctl_vals = []
-                        flg_update = True
-
-                    else:
+                    # 2-qubit gate without control: the control is a 2nd target
+                    gate = valid_2q_noctl.get(mygate)
+                    if gate is None:
                         return {"error": 
                         f"'circuit' entry {j}: gate '{mygate}' does not have 'target' and 'control' qubits"}
 
+                    tgt_vals = tgt_vals + ctl_vals
+                    ctl_vals = []
+                    flg_update = True
+
             else:
 
-                if mygate not in self.gates_1q.values():
-                    if mygate in self.gates_1q.keys():
-                        mygate = self.gates_1q[mygate]
-                        flg_update = True
-                    else:
-                        return {"error":
-                        f"'circuit' entry {j}: gate '{mygate}' is not a one-qubit gate"}
+                gate = valid_1q.get(mygate)
+                if gate is None:
+                    return {"error":
+                    f"'circuit' entry {j}: gate '{mygate}' is not a one-qubit gate"}
+
+            mygate, renamed = gate
+            if renamed:
+                flg_update = True
 
             if flg_update:
                 updates.append(j)
@@ -776,6 +1192,10 @@ help(on_method) - print help text
                 circ = {"gate": mygate, "targets": tgt_vals}
                 if len(ctl_vals)>0:
                     circ.update({"controls": ctl_vals})
+                # other entries (e.g. 'rotation') are kept
+                for k,v in entry.items():
+                    if k not in _QUBIT_KEYS:
+                        circ[k] = _as_list(v) if k in ("parameters", "rotations") else v
                 valid_circ.append(circ)
 
             else:
@@ -799,7 +1219,7 @@ validate_jobid_hash(jobid)
         """
 
         if isinstance(jobid, dict):
-            if "id" not in jobid.keys():
+            if "id" not in jobid:
                 return {"error" : f"{jobid} does not have key 'id'"}
             id = jobid["id"]
 
@@ -809,6 +1229,10 @@ validate_jobid_hash(jobid)
         else:
             return {"error": f"{jobid} is not a string"}
 
+        if isinstance(id, str) and _RE_JOBID.match(id):
+            return {"id": id}
+
+        # not a valid jobID: find the reason
         if len(id)!=36 or id.count("-") != 4:
             return {"error": f"{id} cannot be a valid IonQ JobID"}
 
@@ -820,9 +1244,8 @@ validate_jobid_hash(jobid)
             if len(val) != n:
                 return {"error": f"{id} cannot be a valid IonQ JobID (hash of wrong length: {val})"}
 
-            for ch in val:
-                if ch not in [*'1234567890abcdef']:
-                    return {"error": f"{id} cannot be a valid IonQ JobID (hash with wrong hex char: {val})"}
+            if not _HEX_CHARS.issuperset(val):
+                return {"error": f"{id} cannot be a valid IonQ JobID (hash with wrong hex char: {val})"}
 
         return {"id": id}
 
@@ -838,27 +1261,21 @@ validate_jobid_hash(jobid)
 
         if isinstance(list_dict_file, dict):
 
-            if verbose: print("'get_jobids_from_input' dict keys:",list_dict_file.keys())
+            if verbose: print("'get_jobids_from_input' dict keys:",list(list_dict_file))
 
-            if "name" in list_dict_file.keys():
-                name_base = list_dict_file["name"]
+            name_base = list_dict_file.get("name", name_base)
+            ids = list_dict_file.get("ids", list_dict_file.get("id"))   # list of "ids" or single "id"?
 
-            if "ids" in list_dict_file.keys():
-                jobidlist = list_dict_file["ids"]
-
-            elif "id" in list_dict_file.keys():       # single "id"?
-                if isinstance(list_dict_file["id"],list):
-                    jobidlist = list_dict_file["id"]
-                else: 
-                    jobidlist = [list_dict_file["id"]]
+            if ids is not None:
+                jobidlist = ids if isinstance(ids, list) else [ids]
 
             else:
                 for k,v in list_dict_file.items():
                     outdict = self.validate_jobid_hash(v)
-                    if "error" in outdict.keys():
+                    if "error" in outdict:
                         if verbose: print("ERROR:", outdict)
                     else:
-                        jobdict.update({k: outdict["id"]})
+                        jobdict[k] = outdict["id"]
 
                 if len(jobdict) == 0:
                     return {"error": f' dict "{list_dict_file}" does not contain keys "ids" or "id"'}
@@ -871,20 +1288,21 @@ validate_jobid_hash(jobid)
 
             if os.path.exists(list_dict_file):
 
+                # lines of form "jobid" or "name : jobid" (read line by line, jobid checked by _RE_JOBID)
                 with open(list_dict_file, "r") as f: 
-                    lines = f.readlines()
 
-                    for j,id in enumerate(lines):
+                    for j,line in enumerate(f):
+
+                        if line.startswith("#"):
+                            continue
 
-                        if id[0] != "#":
-                            vals = id.strip().split(":")
-                            outdict = self.validate_jobid_hash(vals[-1].strip())
+                        id = line.rsplit(":", 1)[-1].strip()
 
-                            if "id" in outdict.keys():
-                                if len(vals) > 1:
-                                    jobdict.update({ vals[0].strip(): outdict["id"] })
-                                else:
-                                    jobdict.update({ f"{name_base}{j}": outdict["id"] })
+                        if _RE_JOBID.match(id):
+                            if ":" in line:
+                                jobdict[line.split(":", 1)[0].strip()] = id
+                            else:
+                                jobdict[f"{name_base}{j}"] = id
 
                     if verbose: print("'get_jobids_from_input' got ids from file",jobdict)
 
@@ -898,11 +1316,11 @@ validate_jobid_hash(jobid)
 
             for j,id in enumerate(jobidlist):
                 outdict = self.validate_jobid_hash(id)
-                if "error" in outdict.keys():
+                if "error" in outdict:
                     if verbose: 
                         print(f'List entry {j} ("{id}") is not a valid jobid UID string')
                 else:
-                    jobdict.update({ f"{name_base}{j}": outdict["id"] })
+                    jobdict[f"{name_base}{j}"] = outdict["id"]
 
             if len(jobdict) == 0:
                 return {"error": f"No valid jobid UID strings found in {list_dict_file}"}
@@ -912,7 +1330,7 @@ validate_jobid_hash(jobid)
 ###############################################################################
 # User functions:
 
-    def retrieve_job(self, jobid=None, wait_minutes=0, verbose=False, sharpen=False):
+    def retrieve_job(self, jobid=None, wait_minutes=0, verbose=False, sharpen=False, use_cache=True):
         """
      jobid can be a UID string or dict: {"id": jobid}
         """ 
@@ -925,71 +1343,68 @@ validate_jobid_hash(jobid)
             jobid = self.last_jobid_dict
         if verbose: print(jobid, type(jobid))
         jobid = self.validate_jobid_hash(jobid)
-        if "error" in jobid.keys():
+        if "error" in jobid:
             return jobid
         jobid = jobid["id"]
 
+        if use_cache and os.path.exists(self._cache_file(jobid, sharpen)):
+            try:
+                with open(self._cache_file(jobid, sharpen)) as f:
+                    data = _loads(f.read())
+                if verbose: print(f"job {jobid} read from {f.name}")
+                self.last_jobid_dict = data
+                return data
+            except (OSError, ValueError):
+                pass
+
         flg_waitprint = True
-        wait_minutes *= 4  #check in 15 sec intervals
+        deadline = time.monotonic() + 60*wait_minutes
+        interval, max_interval = 1.0, 60.0  # poll interval grows by 1.5x per check up to max_interval
 
-        while wait_minutes >= 0:  
+        while True:  
 
-            response = requests.get(f'https://api.ionq.co/v0.3/jobs/{jobid}', headers=self.api_header)
+            response = self.session.get(f'https://api.ionq.co/v0.3/jobs/{jobid}')
 
             if response.ok:
-                data = response.json()
+                data = _loads(response.content)
                 if verbose: print(f"GET returned: {data}")
                 self.last_jobid_dict = data
 
                 if data["status"] in ["failed", "canceled"]:
-                    wait_minutes = 0
+                    deadline = 0
+                    self._save_to_cache(data)
+                if data.get("target", "simulator") != "simulator":
+                    max_interval = 900.0  # QPU jobs queue for minutes to hours
 
                 if data["status"] == "completed":
-                    results = requests.get(f"https://api.ionq.co{data['results_url']}?sharpen={sharpen}", headers=self.api_header)
+                    results = self.session.get(f"https://api.ionq.co{data['results_url']}?sharpen={sharpen}")
 
                     if results.ok:
 
-                        shots = float(data["shots"]) if "shots" in data.keys() else 1024.0
+                        shots = float(data["shots"]) if "shots" in data else 1024.0
                         nqbits = data["qubits"]
                         qmask = 2**nqbits -1
 
-                        if "metadata" in data.keys() and "qiskit_header" in data["metadata"].keys():
+                        if "metadata" in data and "qiskit_header" in data["metadata"]:
                             mydat = data["metadata"]["qiskit_header"]
                             if not isinstance(mydat, dict): 
                                 if self.qiskit_installed == 2:
                                     data["metadata"]["qiskit_header"] = decompress_metadata_string_to_dict(mydat)                                                      
 
-                        resdata = results.json()
+                        resdata = _loads(results.content)
                         if verbose: print("GET returned results:",resdata)
 
-                        # returned 'counts' or 'probabilities'?
-                        sumcnts = 0
-                        for val in resdata.values():
-                            sumcnts += val
-
-                        flg_probs = sumcnts > 0.8 and sumcnts < 1.2 
-                        probs={}; cnts={}
-                        sumcnts = 0; sumprobs = 0.0 
-
-                        for k,v in resdata.items():
-                            kbin = bin(int(k))[2:].zfill(data["qubits"])
-                            probs[kbin] = v if flg_probs else v/shots
-                            cnts[kbin] = int(v*shots) if flg_probs else v
-                            sumcnts  += cnts[kbin]
-                            sumprobs += probs[kbin]
-
-                        if sumprobs != 1.0:
-                            for k,v in probs.items():
-                                probs[k] = v/sumprobs
-
-                        if sumcnts != shots:
-                            maxk, maxcnt = '',0
-                            for k,v in cnts.items():
-                                if cnts[k] > maxcnt:
-                                    maxk,maxcnt = k,cnts[k]
-                            cnts[maxk] += int(shots - sumcnts)        
+                        # a multi-circuit job returns {child jobID: histogram}, see submit_batch
+                        if any(isinstance(v, dict) for v in resdata.values()):
+                            errtxt = (f"job {data['id']} is a multi-circuit job: retrieve the results of its child jobs "
+                                      f"{data.get('children', list(resdata))}")
+                            if verbose: print("ERROR:", errtxt)
+                            return {"error": errtxt}
+
+                        probs, cnts = _results_from_histogram(resdata, nqbits, shots)
 
                         data["results"] = {"probabilities": probs, "counts": cnts}
+                        self._save_to_cache(data, sharpen)
 
                         self.last_jobid_dict = data
                         return data
@@ -997,54 +1412,60 @@ validate_jobid_hash(jobid)
                     else:
                         print(f"Retrieved job information but no 'results': {results}")
 
-                elif wait_minutes <= 0:
+                elif time.monotonic() >= deadline:
                     return data
 
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+
             if flg_waitprint: 
-                print(f"... up to {wait_minutes/4} min to go")
+                print(f"... up to {remaining/60:.1f} min to go")
                 flg_waitprint = False
 
-            time.sleep(15)
-            wait_minutes -= 1
+            time.sleep(min(interval, remaining))
+            interval = min(interval*1.5, max_interval)
 
         return {"error": f"{response}"}
 
 ###############
 
-    def submit_job(self, circuit_or_file, wait_minutes=0, verbose=False, **kwargs):
-        """
-      circuit_or_file: qiskit or cirq circuit or json file/string or dictionary or string with QASM code.
-      keys provided as argument overwrite entries in 'circuit_or_file'
-        """
+    #--------------------------------------------
+    # translate and check 'circuit_or_file' (see submit_job) and return the job data to be submitted
+
+    def _prepare_job(self, circuit_or_file, verbose=False, **kwargs):
 
         argtype ='unknown'; datastr = ''
+        # QASM circuits, dicts and circuits translated by qiskit_ionq/cirq_ionq are used directly
+        #   (no detour through a JSON string)
+        source = None
 
         if isinstance(circuit_or_file, str):
 
             if os.path.isfile(circuit_or_file):
 
                 with open(circuit_or_file) as f:
-                    fdat = re.sub('[\r\t]','', f.read())
+                    fdat = f.read().translate(_DEL_CR_TAB)
 
-                    if fdat.find("OPENQASM 2.0", 0, 200) >= 0:
+                    if _is_qasm(io.StringIO(fdat)):
 
                         argtype = 'qasm_file'
-                        datastr = self.translate_qasm(fdat, verbose)
+                        source = self._translate_qasm(fdat, verbose)
 
-                        if datastr is None:
+                        if source is None:
                             return({"error": f"file does not contain an OPENQASM circuit: {circuit_or_file}"})
 
                     else:
 
                         argtype = 'file'
-                        datastr = re.sub('[\n ]','', fdat)
+                        datastr = fdat.translate(_DEL_NL_SPACE)
 
-            elif circuit_or_file.find("OPENQASM 2.0", 0, 200) >= 0:
+            elif _is_qasm(io.StringIO(circuit_or_file)):
 
                 argtype = 'qasm_string'
-                datastr = self.translate_qasm(circuit_or_file, verbose)
+                source = self._translate_qasm(circuit_or_file, verbose)
 
-                if datastr is None:
+                if source is None:
                     return({"error": f"String does not contain an OPENQASM circuit: {circuit_or_file}"})
 
             elif circuit_or_file.find("{")>=0 and circuit_or_file.find(":")>0 and circuit_or_file.find("}")>0:
@@ -1054,13 +1475,11 @@ validate_jobid_hash(jobid)
 
         elif isinstance(circuit_or_file, list): 
 
-            k = 5 if len(circuit_or_file) > 4 else len(circuit_or_file) 
-            fdat = ' '.join(circuit_or_file[:k])
-            if fdat.find("OPENQASM 2.0") >= 0:
+            if _is_qasm(j for j in circuit_or_file if isinstance(j, str)):
                 argtype = 'qasm_list'
-                datastr = self.translate_qasm(circuit_or_file, verbose)
+                source = self._translate_qasm(circuit_or_file, verbose)
 
-                if datastr is None:
+                if source is None:
                     return({"error": f"List does not contain an OPENQASM circuit: {circuit_or_file}"})
 
             else:
@@ -1072,7 +1491,7 @@ validate_jobid_hash(jobid)
         elif isinstance(circuit_or_file, dict):
 
             argtype = 'dict'
-            datastr = json.dumps(circuit_or_file)
+            source = circuit_or_file
 
         else:
 
@@ -1087,7 +1506,7 @@ validate_jobid_hash(jobid)
                         from qiskit_ionq.helpers import qiskit_circ_to_ionq_circ, qiskit_to_ionq
 
                         try:
-                            if "backend" in kwargs.keys() and not isinstance(kwargs["backend"], str): 
+                            if "backend" in kwargs and not isinstance(kwargs["backend"], str): 
 
                                 backend = kwargs.pop("backend")
                                 argtype = 'QISKITcircuit2ionq'
@@ -1097,19 +1516,19 @@ validate_jobid_hash(jobid)
 
                                 argtype = 'QISKITcircuit'
                                 circ, _, _ = qiskit_circ_to_ionq_circ(circuit_or_file)
-                                datastr = json.dumps({"body": { "gateset": "qis", "qubits": circuit_or_file.num_qubits, "circuit": circ } })         
+                                source = {"body": { "gateset": "qis", "qubits": circuit_or_file.num_qubits, "circuit": circ } }
 
                         except:
 
                             argtype = 'qasmQISKITcircuit'
-                            datastr = self.translate_qasm(circuit_or_file.qasm(), verbose)
+                            source = self._translate_qasm(circuit_or_file.qasm(), verbose)
                     else:
 
                         #translate QASM circuit
                         argtype = 'qasmQISKITcircuit'
-                        datastr = self.translate_qasm(circuit_or_file.qasm(), verbose)
+                        source = self._translate_qasm(circuit_or_file.qasm(), verbose)
 
-            if len(datastr) < 1 and self.cirq_installed > 0:    
+            if len(datastr) < 1 and source is None and self.cirq_installed > 0:    
 
                 import cirq
 
@@ -1121,99 +1540,109 @@ validate_jobid_hash(jobid)
 
                         try:
 
-                            if "backend" in kwargs.keys() and isinstance(kwargs["backend"], cirq_ionq.Service):
+                            if "backend" in kwargs and isinstance(kwargs["backend"], cirq_ionq.Service):
                                 kwargs["backend"] = kwargs["backend"]._client.default_target
                                 
                             argtype = 'CIRQcircuit2ionq'
                             circ = cirq_ionq.Serializer().serialize(circuit_or_file)
-                            datastr = json.dumps({"body": circ.body, "metadata": circ.metadata})
+                            source = {"body": circ.body, "metadata": circ.metadata}
 
                         except:
 
                             argtype = 'qasmCRIQcircuit'
-                            datastr = self.translate_qasm(cirq.qasm(circuit_or_file), verbose)
+                            source = self._translate_qasm(cirq.qasm(circuit_or_file), verbose)
                             
                     else:
 
                         argtype = 'qasmCIRQcircuit'
-                        datastr = self.translate_qasm(cirq.qasm(circuit_or_file), verbose)
+                        source = self._translate_qasm(cirq.qasm(circuit_or_file), verbose)
 
-            if len(datastr) < 1:
+            if len(datastr) < 1 and source is None:
 
                 return {"error": f"translation of '{circuit_or_file}' (type={type(circuit_or_file)}) not implemented"}
 
-        if verbose: print(argtype+":",datastr)
+        if source is not None:
 
-        # JSON requires double quotes, not single quotes
-        # JSON does not allow trailing comma in dicts & lists
-        datastr = datastr.replace("'",'"').replace(".]","]").replace(".}","}")
+            if verbose: print(argtype+":",source)
 
-        try:
+            # copy the dictionaries which are updated below (source remains unchanged for error messages)
+            data = {k: dict(v) if isinstance(v, dict) else v for k,v in source.items()}
 
-            data = json.loads(datastr)
+        else:
 
-        except ValueError:
+            if verbose: print(argtype+":",datastr)
 
-            if argtype=='file':
-                text="This is not a valid JSON file: {}".format(circuit_or_file)
-            elif argtype=='string':
-                text="This is not a valid JSON format: {}".format(circuit_or_file)
-            elif argtype=='dict':
-                text="This is not a valid dictionary: {}".format(circuit_or_file)
-            elif argtype=='circuit' or argtype.endswith('Circuit2ionq'):
-                text="Circuit could not be translated to JSON format"
-            elif argtype.endswith('QASMcircuit'):
-                text="QASM circuit could not be translatedcto JSON format"
-            else:
-                text="Unknown input format: {}".format(circuit_or_file)
-            return {"error": text}
+            # JSON requires double quotes, not single quotes
+            # JSON does not allow trailing comma in dicts & lists
+            datastr = _RE_TRAILING_DOT.sub('', datastr.replace("'",'"'))
+
+            try:
+
+                data = _loads(datastr)
+
+            except ValueError:
+
+                if argtype=='file':
+                    text="This is not a valid JSON file: {}".format(circuit_or_file)
+                elif argtype=='string':
+                    text="This is not a valid JSON format: {}".format(circuit_or_file)
+                elif argtype=='dict':
+                    text="This is not a valid dictionary: {}".format(circuit_or_file)
+                elif argtype=='circuit' or argtype.endswith('Circuit2ionq'):
+                    text="Circuit could not be translated to JSON format"
+                elif argtype.endswith('QASMcircuit'):
+                    text="QASM circuit could not be translatedcto JSON format"
+                else:
+                    text="Unknown input format: {}".format(circuit_or_file)
+                return {"error": text}
 
         # check whether basic keys exists and add missing keys
 
-        body_key = "body" if "body" in data.keys() else "input"
-        if body_key not in data.keys():
+        body_key = "body" if "body" in data else "input"
+        try:
+            body = data[body_key]
+        except KeyError:
             return {"error": "dictionary key 'body' is missing in {}".format(data)}
 
-        if not isinstance(data[body_key], dict):
+        if not isinstance(body, dict):
             return {"error": "entry 'body' must be a dictionary in {}".format(data)}
 
-        if "qubits" not in data[body_key].keys():
+        if "qubits" not in body:
             return {"error": "dictionary key 'qubits' is missing in {}".format(data)}
 
-        if "circuit" not in data[body_key].keys():
-            return {"error": "dictionary key 'circuit' is missing in {}".format(data)}
-
-        if not isinstance(data[body_key]["circuit"], list):
+        circuit = body.get("circuit")
+        if not isinstance(circuit, list):
+            if "circuit" not in body:
+                return {"error": "dictionary key 'circuit' is missing in {}".format(data)}
             return {"error": "entry 'circuit' must be a list in {}".format(data)}    
 
-        if "gateset" not in data[body_key].keys():
-            data[body_key]["gateset"] = "qis"    
+        body.setdefault("gateset", "qis")
 
         datentries = {"lang": "json", "target": "simulator", "shots": 1024, "name": "circuit"}
  
         for k,v in datentries.items():
 
-            if k in kwargs.keys():
+            if k in kwargs:
                 data[k] = kwargs.pop(k)
 
-            elif k not in data.keys() or data[k] is None:
+            elif k not in data or data[k] is None:
                 data[k] = v 
 
-        if "backend" in kwargs.keys() and "target" not in kwargs.keys():
+        if "backend" in kwargs and "target" not in kwargs:
             backend = kwargs.pop("backend")
             if not isinstance(backend, str): backend = backend.name()
 
             data["target"] = backend[5:] if backend.startswith("ionq_") else backend
 
-        if "noise" in kwargs.keys():
+        if "noise" in kwargs:
             data["noise"] = kwargs.pop("noise") if isinstance(kwargs["noise"], dict) else {"model": kwargs.pop("noise")}
 
-        elif "noise_model" in kwargs.keys():
+        elif "noise_model" in kwargs:
             data["noise"] = {"model": kwargs.pop("noise_model")}
 
         if data["target"] == "simulator":
 
-            if "noise" not in data.keys():
+            if "noise" not in data:
                 data["noise"] = {"model": "ideal"}
 
             else:
@@ -1224,15 +1653,15 @@ validate_jobid_hash(jobid)
                 if val.endswith("aria"):
                     data["noise"]["model"] = "aria-1"
             
-            if "sampler_seed" in kwargs.keys():
+            if "sampler_seed" in kwargs:
                 data["sampler_seed"] = kwargs["sampler_seed"]
 
-            if "sampler_seed" in data.keys():
+            if "sampler_seed" in data:
                 data["noise"].update({"seed": data["sampler_seed"]})
 
         else:
 
-            if "noise" in data.keys() and data["target"] == "qpu":
+            if "noise" in data and data["target"] == "qpu":
                 v = data.pop("noise")
                 data["target"] = f'qpu.{v["model"]}'
 
@@ -1242,112 +1671,165 @@ validate_jobid_hash(jobid)
             if data["target"] in ["aria", "aria-1", "qpu.aria"]:
                 data["target"] = "qpu.aria-1"
 
-        if "metadata" in data.keys(): 
-
-            if "shots" in data["metadata"].keys():
-                data["metadata"]["shots"] = str(data["shots"])
+        metadata = data.get("metadata")
+        if metadata: 
 
-            if "sampler_seed" in data["metadata"].keys(): 
+            if "shots" in metadata:
+                metadata["shots"] = str(data["shots"])
 
-                if "sampler_seed" in data.keys():
-                    data["metadata"]["sampler_seed"] = str(data["sampler_seed"])
-                else:
-                    data["metadata"]["sampler_seed"] = str(data["metadata"]["sampler_seed"])
+            if "sampler_seed" in metadata: 
+                metadata["sampler_seed"] = str(data.get("sampler_seed", metadata["sampler_seed"]))
     
-        if "error_mitigation" in kwargs.keys():
+        if "error_mitigation" in kwargs:
             data["error_mitigation"] = kwargs["error_mitigation"]
 
 #        if not argtype.startswith('circuit') and not argtype.startswith('qasm'):
 
-        checked_circuit = self.validate_circuit(data[body_key]["circuit"])
+        checked_circuit = self.validate_circuit(circuit)
         if verbose: 
             print(f'validate_circuit returns {checked_circuit} ({type(checked_circuit)})')
 
-        if "error" in checked_circuit.keys():
-            checked_circuit.update({"data": datastr})
+        if "error" in checked_circuit:
+            checked_circuit.update({"data": datastr if source is None else _dumps(source)})
             return checked_circuit
 
-        if "updated_entries" in checked_circuit.keys():
+        if "updated_entries" in checked_circuit:
             mydat = checked_circuit.pop("updated_entries")
-            data[body_key].update(checked_circuit)
+            body.update(checked_circuit)
             if verbose:
                  print(f"validate_circuit: corrected gates in 'circuit' entries {mydat}")
 
-        if verbose: print("before send:",data)
+        return data
 
-        header = self.api_header
-        header.update({"Content-Type": "application/json"})
+    #--------------------------------------------
+    # save jobid of a QPU job to the file defined by 'save_file' or 'jobid_file_base' (see submit_job)
 
-        response = requests.post('https://api.ionq.co/v0.3/jobs', headers=header, json=data, verify=False)
+    def _jobid_file(self, filename):
+        # keep the jobid file open for appending instead of reopening it for every job
+        f = self._jobid_files.get(filename)
+        if f is None or f.closed:
+            f = open(filename, "a", buffering=1<<16)
+            self._jobid_files[filename] = f
+            atexit.register(f.close)
+        return f
 
-        if response.ok:
+    def _new_jobid_file(self, filebase):
+        # create the first free file of filebase.txt, filebase0.txt, filebase1.txt, ...
+        #  exclusive creation ('x') cannot clash with other threads and the index of the last
+        #  created file is remembered, so the directory is only scanned for the first file
+        with self._save_lock:
+            j = self._jobid_next.get(filebase)
+            if j is None:
+                j = _next_file_index(filebase)
+            while True:
+                try:
+                    f = open(f"{filebase}.txt" if j < 0 else f"{filebase}{j}.txt", "x")
+                    break
+                except FileExistsError:
+                    j += 1
+            self._jobid_next[filebase] = j + 1
+        return f
 
-            outdata = response.json()
-            if verbose: print(f"POST returned: {outdata}")
+    def _save_jobid(self, jobid, flush=True, **kwargs):
 
-            #try to read results ...
-            if wait_minutes > 0:
+        linetext = f"{datetime.now().strftime('%Y.%m.%d-%H_%M_%S')} : {jobid}\n"
 
-                results = self.retrieve_job(outdata, wait_minutes=wait_minutes, verbose=verbose)
+        save_file = kwargs.get("save_file")
 
-                if 'error' in results.keys():
-                    outdata.update(results)
-                else:
-                    outdata = results
+        if save_file is None:
 
-            if outdata["status"] in ["submitted", "ready"] and data["target"] != "simulator":
+            jobid_file_base = self.jobid_file_base
 
-                linetext = f"{datetime.now().strftime('%Y.%m.%d-%H_%M_%S')} : {outdata['id']}\n"
+        elif isinstance(save_file, io.TextIOBase): 
 
-                if "save_file" in kwargs.keys():
+            f = save_file
+            with self._save_lock:
+                if f.closed:
+                    f = self._jobid_file(f.name)
 
-                    if isinstance(kwargs["save_file"], bool):
+                f.write(linetext)
+                if flush: f.flush()
 
-                        jobid_file_base = self.jobid_file_base if kwargs["save_file"] else ""
+            jobid_file_base = ""
 
-                    elif isinstance(kwargs["save_file"], str):
+        elif isinstance(save_file, bool):
 
-                        jobid_file_base = kwargs["save_file"]
+            jobid_file_base = self.jobid_file_base if save_file else ""
 
-                    elif isinstance(kwargs["save_file"], io.TextIOBase): 
+        else:
 
-                        f = kwargs["save_file"]
-                        if f.closed:
-                            open(f.name,"a").write(linetext)
+            jobid_file_base = str(save_file)
 
-                        else:
-                            f.write(linetext)
+        if len(jobid_file_base) > 0:
 
-                        jobid_file_base = ""
+            if _has_extension(jobid_file_base):
 
-                else:
+                with self._save_lock:
+                    f = self._jobid_file(jobid_file_base)
+                    f.write(linetext)
+                    if flush: f.flush()
+
+            else:
 
-                    jobid_file_base = self.jobid_file_base
+                with self._new_jobid_file(jobid_file_base) as f:
+                    f.write(linetext)
+
+###############
+
+    def submit_job(self, circuit_or_file, wait_minutes=0, verbose=False, **kwargs):
+        """
+      circuit_or_file: qiskit or cirq circuit or json file/string or dictionary or string with QASM code.
+      keys provided as argument overwrite entries in 'circuit_or_file'
+        """
 
-                if len(jobid_file_base) > 0:
+        cache_mode = kwargs.pop("cache_mode", "off")
+        if cache_mode not in _CACHE_MODES:
+            errtxt = f"unknown cache_mode '{cache_mode}' (options: 'off', 'readWrite', 'readOnly', 'writeOnly')"
+            if verbose: print("ERROR:", errtxt)
+            return {"error": errtxt}
 
-                    if len(jobid_file_base) > 4 and jobid_file_base.find('.', -5) >= 0:
+        data = self._prepare_job(circuit_or_file, verbose, **kwargs)
+        if "error" in data:
+            return data
 
-                        ioflag = "a" if os.path.exists(jobid_file_base) else "w"
+        if cache_mode != "off":
+            key = self._submission_key(data)
 
-                        with open(jobid_file_base, ioflag) as f:
-                            f.write(linetext)
+            # reuse an identical earlier job, unless it failed or has been canceled
+            if cache_mode in ["readWrite", "readOnly"] and key in self._submissions():
+                outdata = self.retrieve_job(self._submission_cache[key], wait_minutes=wait_minutes, verbose=verbose)
 
-                    else:
+                if "error" not in outdata and outdata.get("status") not in ["failed", "canceled"]:
+                    if verbose: print(f"cache hit: identical job {outdata['id']} was already submitted")
+                    self.last_jobid_dict = outdata
+                    return outdata
 
-                        if not os.path.exists(f"{jobid_file_base}.txt"):
+        if verbose: print("before send:",data)
 
-                            with open(f"{jobid_file_base}.txt", "w") as f:
-                                f.write(linetext)
+        response = self.session.post('https://api.ionq.co/v0.3/jobs', data=_dumpb(data),
+                                     headers={"Content-Type": "application/json"})
 
-                        else:
+        if response.ok:
 
-                            j = 0
-                            while os.path.exists(f"{jobid_file_base}{j}.txt"):
-                                j +=1
+            outdata = _loads(response.content)
+            if verbose: print(f"POST returned: {outdata}")
 
-                            with open(f"{jobid_file_base}{j}.txt", "w") as f:
-                                f.write(linetext)            
+            if cache_mode in ["readWrite", "writeOnly"]:
+                self._save_submission(key, outdata["id"])
+
+            #try to read results ...
+            if wait_minutes > 0:
+
+                results = self.retrieve_job(outdata, wait_minutes=wait_minutes, verbose=verbose)
+
+                if 'error' in results:
+                    outdata.update(results)
+                else:
+                    outdata = results
+
+            if outdata["status"] in ["submitted", "ready"] and data["target"] != "simulator":
+
+                self._save_jobid(outdata["id"], **kwargs)
 
             self.last_jobid_dict = outdata
             return outdata
@@ -1375,7 +1857,7 @@ validate_jobid_hash(jobid)
 
         if verbose: print("cancel_job: validate_jobid_hash returned:",jobid_dict)
 
-        if "error" in jobid_dict.keys():
+        if "error" in jobid_dict:
             errtxt = "Use function: 'cancel_multiple_jobs' instead"
 
             if isinstance(jobid, list):
@@ -1389,18 +1871,18 @@ validate_jobid_hash(jobid)
             elif isinstance(jobid, str) and os.path.exists(jobid):
                 jobid_dict.update({"NOTE": errtxt})
 
-            if "error" in jobid_dict.keys():
+            if "error" in jobid_dict:
                 return jobid_dict
         
         if verbose: print("before GET",jobid_dict)
 
-        response = requests.get(f'https://api.ionq.co/v0.3/jobs/{jobid_dict["id"]}', headers=self.api_header)
+        response = self.session.get(f'https://api.ionq.co/v0.3/jobs/{jobid_dict["id"]}')
 
         if response.ok:
 
-            data = response.json()
+            data = _loads(response.content)
 
-            if "status" not in data.keys():
+            if "status" not in data:
                 return {"error": f"No 'status' information retrieved for job {jobid_dict['id']}"}
  
             if data["status"] in ['failed','running','completed','canceled']:
@@ -1408,10 +1890,10 @@ validate_jobid_hash(jobid)
                 return data
 
             else:
-                response = requests.put(f'https://api.ionq.co/v0.3/jobs/{jobid_dict["id"]}/status/cancel', headers=self.api_header)
+                response = self.session.put(f'https://api.ionq.co/v0.3/jobs/{jobid_dict["id"]}/status/cancel')
 
                 if response.ok:
-                    return response.json()
+                    return _loads(response.content)
 
                 else:
                     errtxt = f"Request to cancel job {jobid_dict['id']} returned {response}"
@@ -1427,7 +1909,7 @@ validate_jobid_hash(jobid)
 #############################################################
 # User function for multiple job submission, retrieval, cancelling
     
-    def retrieve_multiple_jobs(self, list_dict_file=None, wait_minutes=0, verbose=False, sharpen=False):
+    def retrieve_multiple_jobs(self, list_dict_file=None, wait_minutes=0, verbose=False, sharpen=False, max_workers=8):
         #input: list of jobids (list or dict or file)
 
         if list_dict_file is None:
@@ -1439,18 +1921,20 @@ validate_jobid_hash(jobid)
  
         jobdict = self.get_jobids_from_input(list_dict_file, verbose=verbose)
 
-        if "error" in jobdict.keys():
+        if "error" in jobdict:
             if verbose: print("ERROR in 'retrieve_multiple_jobs':", jobdict["error"])
             return jobdict
 
         if verbose: print("get_jobids_from_input returned:", jobdict)
 
-        outdict = {}
-        for name, jobid in jobdict.items():
-
+        def retrieve(item):
+            name, jobid = item
             if verbose: print(name, jobid)
-            data = self.retrieve_job(jobid, wait_minutes=wait_minutes, verbose=verbose, sharpen=sharpen)
-            outdict.update({f"{name}": data})
+            return name, self.retrieve_job(jobid, wait_minutes=wait_minutes, verbose=verbose, sharpen=sharpen)
+
+        # the jobs are independent: overlap the HTTP requests (and the waiting for completion)
+        with ThreadPoolExecutor(max_workers=_num_workers(max_workers, len(jobdict))) as ex:
+            outdict = {f"{name}": data for name, data in ex.map(retrieve, jobdict.items())}
 
         return outdict
 
@@ -1468,24 +1952,30 @@ validate_jobid_hash(jobid)
             print("     ...: additional circuit execution parameters, e.g. shots=NNN, target='simulator', etc. ")
             return {"error": "no input list or dict of circuits provided"}
 
-        name = kwargs.pop("name") if "name" in kwargs.keys() else "circuit"  
+        if isinstance(list_of_circuits, list) and len(list_of_circuits) == 0:
+            return {}
+
+        name = kwargs.pop("name", "circuit")
+        max_workers = kwargs.pop("max_workers", 8)
+        separate_jobs = kwargs.pop("separate_jobs", False)
+        batch_size = kwargs.pop("batch_size", 25)
 
         # not a list but single job?
         if not isinstance(list_of_circuits, list):
             jobdict = self.submit_job(list_of_circuits, wait_minutes=wait_minutes, verbose=verbose, name=name, **kwargs)
 
-            if "error" in jobdict.keys():
+            if "error" in jobdict:
                 return jobdict
  
             return {f"{name}": jobdict}
 
         names = name if isinstance(name, list) else [f"{name}_{j}" for j in range(len(list_of_circuits))]
 
-        if "name_base" in kwargs.keys():
+        if "name_base" in kwargs:
             names = [f"{kwargs['name_base']}{j}" for j in range(len(list_of_circuits))]
             kwargs.pop("name_base")
 
-        elif "names" in kwargs.keys() and isinstance(kwargs["names"], list):
+        elif "names" in kwargs and isinstance(kwargs["names"], list):
             names = kwargs.pop("names")
 
         if len(set(names)) != len(list_of_circuits):
@@ -1495,81 +1985,223 @@ validate_jobid_hash(jobid)
                                 f"({len(names)}) than list of circuits ({len(list_of_circuits)})")
             names = [f"{name}_{j}" for j in range(len(list_of_circuits))]
 
-        outdict = {}; filebase = ""
-
-        if "save_file" in kwargs.keys():
-
-            if isinstance(kwargs["save_file"], bool):
+        outdict = {}
+        save_file = kwargs.get("save_file")
 
-                filebase = self.jobid_file_base if kwargs["save_file"] else ""
+        # an open file is used as it is, otherwise the jobid file is opened once for all jobs
+        if isinstance(save_file, io.TextIOBase):
+            filebase = ""
+        elif save_file is None:
+            filebase = self.jobid_file_base
+        elif isinstance(save_file, bool):
+            filebase = self.jobid_file_base if save_file else ""
+        else:
+            filebase = str(save_file)
 
-            elif isinstance(kwargs["save_file"], io.TextIOBase): 
+        if len(filebase) > 0:
 
-                filebase = ""
-         
+            if _has_extension(filebase):
+                kwargs["save_file"] = open(filebase, "a")
             else:
+                kwargs["save_file"] = self._new_jobid_file(filebase)
 
-                filebase = str(kwargs["save_file"])
+        if separate_jobs:
 
-        else:         
+            def submit(item):
+                nam, circ = item
+                job = self.submit_job(circ, wait_minutes=0, verbose=verbose, name=nam, **kwargs)
+                if "error" in job:
+                    if verbose: print(f"ERROR:",job["error"])
+                return nam, job
 
-            filebase = self.jobid_file_base
+            # submit the circuits concurrently (each submission is one independent POST)
+            with ThreadPoolExecutor(max_workers=_num_workers(max_workers, len(names))) as ex:
+                outdict.update(ex.map(submit, zip(names,list_of_circuits)))
 
-        if len(filebase) > 0:
+        else:
 
-            ioflag = "w"
+            # one multi-circuit job (one POST and one queue entry) per group of compatible circuits
+            #  (submit_batch falls back to single jobs if the server does not accept it)
+            outdict = self.submit_batch(list_of_circuits, verbose=verbose, batch_size=batch_size,
+                                        names=names, max_workers=max_workers, **kwargs)
 
-            if len(filebase) > 4 and filebase.find(".", -5) >= 0:
+        if len(filebase) > 1:
 
-                if os.path.exists(filebase):
-                    ioflag = "a"
+            if isinstance(kwargs["save_file"], io.TextIOBase):
 
-            else:
+                f = kwargs["save_file"]
+                if not f.closed:
+                   f.close()
 
-                if os.path.exists(f"{filebase}.txt"):
+                # files with less than 20 lines are removed (only these lines are read)
+                with open(f.name) as fp:
+                    nlines = sum(1 for _ in islice(fp, 20))
 
-                    j = 0
-                    while os.path.exists(f"{filebase}{j}.txt"):
-                        j +=1 
+                if nlines < 20:
+                    os.remove(fp.name)
 
-                    filebase = f"{filebase}{j}.txt"
+        if wait_minutes > 0:
+            outdict = self.retrieve_multiple_jobs(outdict, wait_minutes=wait_minutes, verbose=verbose)
 
-                else:
+        return outdict
 
-                    filebase += ".txt"
+########################
 
-            kwargs["save_file"] = open(filebase, ioflag)
+    def submit_batch(self, list_of_circuits=None, wait_minutes=0, verbose=False, batch_size=25, **kwargs):
+        #input: list of JSON-formatted circuits (dicts or strings or files) or list of QuantumCircuits;
+        #circuits are combined into multi-circuit jobs of up to 'batch_size' circuits
 
-        for nam,circ in zip(names,list_of_circuits):
+        if not isinstance(list_of_circuits, list) or len(list_of_circuits) == 0:
+            print("Usage:\nsubmit_batch(list_of_circuits, wait_minutes[=0], verbose[=False], batch_size[=25], ...)")
+            print("     list_of_circuits: list of QuantumCircuits or JSON-formatted circuits (dicts or strings or files)")
+            return {"error": "no input list of circuits provided"}
 
-            job = self.submit_job(circ, wait_minutes=0, verbose=verbose, name=nam, **kwargs)
-            if "error" in job.keys():
-                if verbose: print(f"ERROR:",job["error"])
+        name = kwargs.pop("name", "circuit")
+        names = kwargs.pop("names", name)
+        if not isinstance(names, list) or len(set(names)) != len(list_of_circuits):
+            if isinstance(name, list): name = name[0]
+            names = [f"{name}_{j}" for j in range(len(list_of_circuits))]
+        max_workers = kwargs.pop("max_workers", 8)
+        cache_mode = kwargs.pop("cache_mode", "off")
+        if cache_mode not in _CACHE_MODES:
+            errtxt = f"unknown cache_mode '{cache_mode}' (options: 'off', 'readWrite', 'readOnly', 'writeOnly')"
+            if verbose: print("ERROR:", errtxt)
+            return {"error": errtxt}
 
-            outdict.update({nam: job})
+        outdict = dict.fromkeys(names)  # keep the order of the input list
 
-        if len(filebase) > 1:
+        # translate all circuits and group those, which can run in the same job
+        groups = {} ; unbatched = []
+        for nam, circ in zip(names, list_of_circuits):
+            data = self._prepare_job(circ, verbose, name=nam, **kwargs)
+            if "error" in data:
+                if verbose: print(f"ERROR:",data["error"])
+                outdict[nam] = data
+                continue
+            # the job metadata (e.g. the qiskit_header read by retrieve_job) belongs to one circuit: single job
+            if data.get("metadata"):
+                unbatched.append((nam, circ, data))
+                continue
+            key = json.dumps([data["target"], data["shots"], data.get("noise"), data.get("error_mitigation")], sort_keys=True)
+            groups.setdefault(key, []).append((nam, circ, data))
+
+        batches = [jobs[j:j+batch_size] for jobs in groups.values() for j in range(0, len(jobs), batch_size)]
+
+        def post_batch(item):
+            k, batch = item
+
+            data = batch[0][2]
+            body_key = "body" if "body" in data else "input"
+            payload = {key: data[key] for key in ["lang", "target", "shots", "noise", "error_mitigation"] if key in data}
+            payload["name"] = f"{batch[0][0]}_batch{k}"
+            circuits = []
+            for nam, _, d in batch:
+                body = d["body" if "body" in d else "input"]
+                circuits.append({"name": nam, "circuit": body["circuit"]})
+                if body.get("metadata"):
+                    circuits[-1]["metadata"] = body["metadata"]  # qreg/creg/measure of translated QASM
+            payload["input"] = {"format": "ionq.circuit.v0", "gateset": data[body_key]["gateset"],
+                                "qubits": max(d["body" if "body" in d else "input"]["qubits"] for _, _, d in batch),
+                                "circuits": circuits}
+
+            if cache_mode != "off":
+                key = self._submission_key(payload)
+
+                # reuse an identical earlier multi-circuit job, unless it failed or has been canceled
+                if cache_mode in ["readWrite", "readOnly"] and key in self._submissions():
+                    response = self.session.get(f"https://api.ionq.co/v0.3/jobs/{self._submission_cache[key]}")
+                    if response.ok:
+                        outdata = _loads(response.content)
+                        children = outdata.get("children", [])
+                        if outdata.get("status") not in ["failed", "canceled"] and len(children) == len(batch):
+                            if verbose: print(f"cache hit: identical multi-circuit job {outdata['id']} was already submitted")
+                            return batch, outdata, children
+
+            if verbose: print("before send:", payload)
+            response = self.session.post('https://api.ionq.co/v0.3/jobs', data=_dumpb(payload),
+                                         headers={"Content-Type": "application/json"})
+            if not response.ok:
+                return batch, None, []
+
+            outdata = _loads(response.content)
+            if verbose: print(f"POST returned: {outdata}")
 
-            if isinstance(kwargs["save_file"], io.TextIOBase):
+            def get_children():
+                response = self.session.get(f"https://api.ionq.co/v0.3/jobs/{outdata['id']}")
+                return _loads(response.content).get("children") if response.ok else None
+
+            # the jobIDs of the single circuits are listed as 'children' of the multi-circuit job,
+            #  they may only be listed some time after the job has been submitted; a job without
+            #  'children' entry does not run as multi-circuit job: no waiting for them then
+            children = outdata.get("children")
+            if children is None:
+                children = get_children()
+            for delay in [0.5, 1, 2]:
+                if children is None or len(children) == len(batch):
+                    break
+                time.sleep(delay)
+                children = get_children()
+
+            if children is not None and len(children) == len(batch):
+                if cache_mode in ["readWrite", "writeOnly"]:
+                    self._save_submission(key, outdata["id"])
+                return batch, outdata, children
+
+            # without one jobID per circuit the results can't be assigned to the circuits:
+            #  cancel the multi-circuit job and submit the circuits one by one
+            if verbose: print(f"multi-circuit job {outdata['id']} does not list one jobID per circuit, canceling it")
+            self.cancel_job(outdata["id"])
+            return batch, None, []
+
+        def submit(item):
+            nam, circ, _ = item
+            return nam, self.submit_job(circ, wait_minutes=0, verbose=verbose, name=nam, cache_mode=cache_mode, **kwargs)
+
+        # the first multi-circuit job shows whether the server accepts them, the other ones
+        #  are then submitted concurrently (like the single jobs of submit_multiple_jobs)
+        results = []
+        if len(batches) > 0:
+            results.append(post_batch((0, batches[0])))
+            if results[0][1] is not None and len(batches) > 1:
+                with ThreadPoolExecutor(max_workers=_num_workers(max_workers, len(batches)-1)) as ex:
+                    results.extend(ex.map(post_batch, enumerate(batches[1:], 1)))
+            elif results[0][1] is None:
+                results = [(batch, None, []) for batch in batches]
+
+        # multi-circuit jobs not accepted: submit the circuits one by one
+        single = unbatched + [item for batch, outdata, _ in results if outdata is None for item in batch]
+        if len(single) > 0:
+            if verbose: print(f"multi-circuit job not accepted, submitting {len(single)} single jobs")
+            with ThreadPoolExecutor(max_workers=_num_workers(max_workers, len(single))) as ex:
+                outdict.update(ex.map(submit, single))
+
+        for batch, outdata, children in results:
+
+            if outdata is None:
+                continue
 
-                f = kwargs["save_file"]
-                if not f.closed:
-                   f.close()
+            data = batch[0][2]
+            for (nam, _, _), jobid in zip(batch, children):
+                outdict[nam] = {"id": jobid, "status": outdata["status"], "parent_id": outdata["id"]}
 
-                with open(f.name) as fp:
-                    nchars = len(fp.readlines())
+            if outdata["status"] in ["submitted", "ready"] and data["target"] != "simulator":
+                for jobid in children:
+                    self._save_jobid(jobid, flush=False, **kwargs)
 
-                if nchars < 20:
-                    os.remove(fp.name)
+        with self._save_lock:
+            for f in self._jobid_files.values():
+                if not f.closed: f.flush()
+        if isinstance(kwargs.get("save_file"), io.TextIOBase) and not kwargs["save_file"].closed:
+            kwargs["save_file"].flush()
 
         if wait_minutes > 0:
-            outdict = self.retrieve_multiple_jobs(outdict, wait_minutes=wait_minutes, verbose=verbose)
+            outdict = self.retrieve_multiple_jobs(outdict, wait_minutes=wait_minutes, verbose=verbose, max_workers=max_workers)
 
         return outdict
 
 ########################
 
-    def cancel_multiple_jobs(self, list_dict_file=None, verbose=False):
+    def cancel_multiple_jobs(self, list_dict_file=None, verbose=False, max_workers=8):
         #input be a list or dict of jobids or file containing one jobid per line
 
         if list_dict_file is None:
@@ -1584,30 +2216,31 @@ validate_jobid_hash(jobid)
         if len(jobids) == 0:
             return jobdict
 
-        jsonstr = '{ "ids": ["'
-        jsonstr += '","'.join(jobids)
-        jsonstr += '"] }'
-        if verbose: print(jsonstr)
+        payload = {"ids": jobids}
+        if verbose: print(payload)
       
-        header = self.api_header
-        header.update({"Content-Type": "application/json"})
-
-        response = requests.put('https://api.ionq.co/v0.3/jobs/status/cancel', headers=header, json=jsonstr, verify=False)
+        # the session sends the authorization header (self.api_header is not modified)
+        response = self.session.put('https://api.ionq.co/v0.3/jobs/status/cancel', data=_dumpb(payload),
+                                    headers={"Content-Type": "application/json"})
 
         if verbose: print(f"PUT returned: {response}")
 
         if response.ok:
-            data = response.json()
+            data = _loads(response.content)
             if verbose: print("PUT data:", data)
             ncancelled = len(data["ids"])
 
         else:
             ncancelled = 0
             datalist = []
-            for id in jobids:
-                outdict = self.cancel_job(id, verbose)
+
+            # cancel the jobs one by one (concurrently: each job needs a GET and a PUT request)
+            with ThreadPoolExecutor(max_workers=_num_workers(max_workers, len(jobids))) as ex:
+                outdicts = list(ex.map(lambda id: self.cancel_job(id, verbose), jobids))
+
+            for outdict in outdicts:
                 if verbose: print(outdict)
-                if "status" in outdict.keys() and outdict["status"] == "canceled":
+                if outdict.get("status") == "canceled":
                     ncancelled +=1
                     datalist.append(outdict["id"])
  
@@ -1620,47 +2253,63 @@ validate_jobid_hash(jobid)
 ##########################
 # User function to retrieve results from returned dictionary
 
-    def extract_probabilities(self, jobdict=None, rounded=None, truncate=None):
-        """
-   Extract probabilities for all results (single or multiple retrieved jobs)
-        """
+    def _jobdict_from_input(self, jobdict, wait_minutes=0):
+        # input of extract_probabilities/extract_counts: dict(s) of jobs or jobID(s), which are retrieved first
+        #  returns None (after printing the error) if there is no dictionary of jobs
 
         if jobdict is None:
             jobdict = self.last_jobid_dict
 
-        if rounded is not None:
-            if rounded in ["auto","yes"]:  rounded = -1
+        if isinstance(jobdict, str):
+            jobdict = self.retrieve_job(jobdict, wait_minutes=wait_minutes)
+            if "error" in jobdict: jobdict = None
+
+        elif isinstance(jobdict, list):
+            jobdict = self.retrieve_multiple_jobs(jobdict, wait_minutes=wait_minutes)
+            if "error" in jobdict: jobdict = None
+
+        # dict(s) of jobs (not retrieved above): wait for the unfinished ones only here, so that
+        #  wait_minutes is not spent twice
+        elif isinstance(jobdict, dict) and "id" in jobdict and "status" in jobdict:
+            if jobdict["status"] in ["submitted", "ready", "running"]:
+                retrieved = self.retrieve_job(jobdict, wait_minutes=wait_minutes)
+                if "error" not in retrieved: jobdict = retrieved
+
+        elif isinstance(jobdict, dict):
+            # several jobs: retrieve the unfinished ones concurrently (instead of one after the other)
+            pending = [(k,v) for k,v in jobdict.items() if isinstance(v, dict) and v.get("status") in ["submitted", "ready", "running"]]
+            if len(pending) > 0:
+                with ThreadPoolExecutor(max_workers=_num_workers(8, len(pending))) as ex:
+                    retrieved = ex.map(lambda item: (item[0], self.retrieve_job(item[1], wait_minutes=wait_minutes)), pending)
+                    jobdict = dict(jobdict)
+                    jobdict.update(retrieved)
 
-        if isinstance(jobdict, list) or isinstance(jobdict, str):
+        if not isinstance(jobdict, dict):
+            print("ERROR: input is not a dictionary (use the returned dict of 'retrieve_job' or 'retrieve_multiple_jobs' as input) ")
+            return None
 
-            if isinstance(jobdict, str):
-                jobdict = self.retrieve_job(jobdict)
+        return jobdict
 
-            else:
-                jobdict = self.retrieve_multiple_jobs(jobdict)
+    def extract_probabilities(self, jobdict=None, rounded=None, truncate=None, wait_minutes=0):
+        """
+   Extract probabilities for all results (single or multiple retrieved jobs)
+        """
 
-            if "error" in jobdict.keys():
-                print("ERROR: input is not a dictionary (use the returned dict of 'retrieve_job' or 'retrieve_multiple_jobs' as input) ")
-                return None
+        if rounded is not None:
+            if rounded in ["auto","yes"]:  rounded = -1
 
-        if not isinstance(jobdict, dict):
-            print("ERROR: input is not a dictionary (use the returned dict of 'retrieve_job' or 'retrieve_multiple_jobs' as input) ")
+        jobdict = self._jobdict_from_input(jobdict, wait_minutes)
+        if jobdict is None:
             return None
 
-        if "id" in jobdict.keys() and "status" in jobdict.keys():  #assume single job
-
-            if jobdict["status"] in ["submitted", "ready"]:
-                jobdict = self.retrieve_job(jobdict)
+        if "id" in jobdict and "status" in jobdict:  #assume single job
 
             if jobdict["status"] == "completed":
                 probs = jobdict["results"]["probabilities"]
                 if rounded is not None:
                     if rounded < 1:
-                        n = jobdict["shots"] if "shots" in jobdict.keys() else 1024
-                        rounded = 0
-                        while n//(10**rounded) > 0:
-                            rounded += 1
-                    probs.update((key, round(val, rounded)) for key, val in probs.items())
+                        rounded = _num_digits(jobdict.get("shots", 1024))
+                    probs = _round_probabilities(probs, rounded)
                 return probs
 
             else:
@@ -1672,86 +2321,44 @@ validate_jobid_hash(jobid)
             outdict = {}
             for k,v in jobdict.items():
 
-                if isinstance(v, dict):
-
-                    if v["status"] in ["submitted", "ready"]:
-                        v = self.retrieve_job(v)
+                if not isinstance(v, dict):
+                    print(f"{k}:", v)
+                    continue
 
-                    if "error" in v.keys() or v["status"] != "completed":
-                        print(f"{k}:", v)
-                    else:
+                if "error" in v or v.get("status") != "completed":
+                    print(f"{k}:", v)
+                    continue
 
-                        probs = v["results"]["probabilities"]
-                        if rounded is not None:
-                            myrounded = rounded
-                            if myrounded < 1:
-                                n = v["shots"] if "shots" in v.keys() else 1024
-                                myrounded = 0
-                                while n//(10**myrounded) > 0:
-                                    myrounded += 1
-                            probs.update((key, round(val, myrounded)) for key, val in probs.items())
- 
-                        outdict.update({f"{k}:": probs})
+                probs = v["results"]["probabilities"]
+                if rounded is not None:
+                    myrounded = rounded
+                    if myrounded < 1:
+                        myrounded = _num_digits(v.get("shots", 1024))
+                    probs = _round_probabilities(probs, myrounded)
 
-                else:
-                    print(f"{k}:", v)
+                outdict[f"{k}:"] = probs
 
             return outdict if len(outdict)>0 else None
 
 ###################
     
-    def extract_counts(self, jobdict=None):
+    def extract_counts(self, jobdict=None, wait_minutes=0, as_array=False):
         """
    Extract counts for all results (single or multiple retrieved jobs)
         """
 
+        jobdict = self._jobdict_from_input(jobdict, wait_minutes)
         if jobdict is None:
-            jobdict = self.last_jobid_dict
-
-        if isinstance(jobdict, list) or isinstance(jobdict, str):
-
-            if isinstance(jobdict, str):
-                jobdict = self.retrieve_job(jobdict)
-
-            else:
-                jobdict = self.retrieve_multiple_jobs(jobdict)
-
-            if "error" in jobdict.keys():
-                print("ERROR: input is not a dictionary (use the returned dict of 'retrieve_job' or 'retrieve_multiple_jobs' as input) ")
-                return None
-
-        if not isinstance(jobdict, dict):
-            print("ERROR: input is not a dictionary (use the returned dict of 'retrieve_job' or 'retrieve_multiple_jobs' as input) ")
             return None
 
-        if "id" in jobdict.keys() and "status" in jobdict.keys():  #assume single job
-
-            if jobdict["status"] in ["submitted", "ready"]:
-                jobdict = self.retrieve_job(jobdict)
+        if "id" in jobdict and "status" in jobdict:  #assume single job
 
             if jobdict["status"] == "completed":
 
-                if "results" in jobdict.keys():
-                    if "counts" in jobdict["results"].keys():
-                        return jobdict["results"]["counts"]
-
-                    elif "shots" in jobdict.keys(): 
-
-                        shots = jobdict["shots"]
-
-                    outdict = {}
-                    if "probabilities" in jobdict["results"].keys():
-                        mydict = jobdict["results"]["probabilities"]
-
-                    else:
-                        mydict = jobdict["results"]
-
-                    for k,v in mydict:
-                        outdict.update({k:int(v*shots)})
-                    return outdict
-
-                print("Job '{}' does not have result counts nor probabilities listed")
-                return None
+                counts = _counts_from_results(jobdict, as_array)
+                if counts is None:
+                    print("Job '{}' does not have result counts nor probabilities listed".format(jobdict["id"]))
+                return counts
                 
             else:
  
@@ -1763,18 +2370,19 @@ validate_jobid_hash(jobid)
             outdict = {}
             for k,v in jobdict.items():
 
-                if isinstance(v, dict):
-                    if v["status"] in ["submitted", "ready"]:
-                        v = self.retrieve_job(v)
-
-                    if "error" in v.keys() or v["status"] != "completed":
-                        print(f"{k}:", v)
+                if not isinstance(v, dict):
+                    print(f"{k}:", v)
+                    continue
 
-                    else: 
-                        outdict.update({f"{k}:": v["results"]["counts"]})
+                if "error" in v or v.get("status") != "completed":
+                    print(f"{k}:", v)
+                    continue
 
+                counts = _counts_from_results(v, as_array)
+                if counts is None:
+                    print(f"{k}: job '{v['id']}' does not have result counts nor probabilities listed")
                 else:
-                    print(f"{k}:", v)
+                    outdict[f"{k}:"] = counts
 
             return outdict if len(outdict)>0 else None
 
@@ -1790,23 +2398,15 @@ get_waittime(backend, data)
        backend="ACCESS" (default): print wait time and status for all backends, to which we have access
     calib_data: flag on whether also to print calibration/characterization results
         """
-        special_vals = ["ALL", "ACCESS"]
-
         if isinstance(backend, str):
             backend = [backend]
 
-        for j,val in enumerate(backend):
-            if val not in special_vals:
-                val = val.lower()
-                if val in ["qpu.aria", "aria"]:
-                    val = "qpu.aria-1"
-                if val == "harmony":
-                    val = "qpu.harmony"
-                backend[j] = val
+        backend = [val if val in _SPECIAL_BACKENDS else _BACKEND_ALIASES.get(val.lower(), val.lower()) for val in backend]
                 
-        response = requests.get("https://api.ionq.co/v0.3/backends", headers = self.api_header)
+        # backend list is reused for 60 seconds, calibration data for one hour (see clear_backend_cache)
+        data, response = self._cached_get("https://api.ionq.co/v0.3/backends", ttl=60)
 
-        if not response.ok:
+        if data is None:
 
             errtxt = f"{response}"
             if response.status_code == 400:
@@ -1817,8 +2417,6 @@ get_waittime(backend, data)
 
             print("ERROR accessing IonQ Server using provided IonQ API token:", errtxt)
             return
-
-        data = response.json()
       
         calibinfo = {}
       
@@ -1827,7 +2425,7 @@ get_waittime(backend, data)
         for mydict in data:
             name = mydict["backend"]
 
-            if backend[0] in special_vals or name in backend:
+            if backend[0] in _SPECIAL_BACKENDS or name in backend:
          
                 if backend[0] == "ACCESS" and int(mydict["has_access"]) == 0: 
                     continue
@@ -1837,9 +2435,8 @@ get_waittime(backend, data)
                 timestamp = datetime.fromtimestamp(mydict["last_updated"])
                 has_access = "Yes" if mydict["has_access"] else "No"
                 degraded = "Yes" if mydict["degraded"] else "No"
-                blanks = " " * (16 - len(name))
 
-                print(" {}: {} {} {:>12s}  {:>5s}   {:>5s}   {:>19s}  ({})".format(name, blanks, mydict["qubits"], mydict["status"], has_access, degraded, waittime, timestamp))
+                print(f" {(name + ': ').ljust(18)} {mydict['qubits']} {mydict['status']:>12s}  {has_access:>5s}   {degraded:>5s}   {waittime:>19s}  ({timestamp})")
 
                 if calib_data:
                     if name == "simulator":
@@ -1851,24 +2448,28 @@ get_waittime(backend, data)
 
             print("\nCalibration data:")
 
+            # fetch the characterizations of all QPUs concurrently (independent GET requests)
+            urls = [f"https://api.ionq.co/v0.3{v}" for k,v in calibinfo.items() if k != "simulator"]
+            with ThreadPoolExecutor(max_workers=_num_workers(8, len(urls))) as ex:
+                characterizations = dict(zip(urls, ex.map(lambda url: self._cached_get(url, ttl=3600)[0], urls)))
+
             for k,v in calibinfo.items():
 
-                blanks = " " * (14 - len(k))
+                label = (k + ': ').ljust(16)
 
                 if k == "simulator":
-                    print("{}: {} noise_models: {}".format(k, blanks, v))
+                    print(f"{label} noise_models: {v}")
 
                 else:
 
-                    response = requests.get(f"https://api.ionq.co/v0.3{v}", headers = self.api_header)
+                    data = characterizations[f"https://api.ionq.co/v0.3{v}"]
 
-                    if response.ok:
-                        data = response.json()
+                    if data is not None:
                         fidinfo = data["fidelity"]
                         timinfo = data["timing"]
 
-                        print("{}: {} fidelity: 1q-gates {:6.4f}, 2q-gates {:6.4f}, prep+meas. {:6.4f}".format(k, blanks, fidinfo["1q"]["mean"], fidinfo["2q"]["mean"], fidinfo["spam"]["mean"]))
-                        print("        timing (in msec): 1q-gates {:6.4f}, 2q-gates {:6.4f}, readout {:6.4f}, reset {:6.4f}".format(timinfo["1q"]*1000, timinfo["2q"]*1000, timinfo["readout"]*1000, timinfo["reset"]*1000))
-                        print("        (date: {})".format(datetime.fromtimestamp(data["date"])))
+                        print(f"{label} fidelity: 1q-gates {fidinfo['1q']['mean']:6.4f}, 2q-gates {fidinfo['2q']['mean']:6.4f}, prep+meas. {fidinfo['spam']['mean']:6.4f}")
+                        print(f"        timing (in msec): 1q-gates {timinfo['1q']*1000:6.4f}, 2q-gates {timinfo['2q']*1000:6.4f}, readout {timinfo['readout']*1000:6.4f}, reset {timinfo['reset']*1000:6.4f}")
+                        print(f"        (date: {datetime.fromtimestamp(data['date'])})")
 
     